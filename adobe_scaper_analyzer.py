@@ -1,163 +1,235 @@
 import csv
 import asyncio
+import json
 import os
 import re
 from typing import List, Dict
 from datetime import datetime
 import argparse
 
-from pyppeteer import launch
-from bs4 import BeautifulSoup
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-import nltk
+from browser_pool import BrowserPool, ResourceBlocker
+from concurrent_fetch import HostRateLimiter, gather_bounded
+from dedupe import DEFAULT_THRESHOLD, mark_duplicates
+from html_parsing import extract_adobe_listings, html_to_text
+from http_client import HttpClient
+from job_cache import add_cache_arguments, open_cache
+from keyword_matcher import KeywordMatcher
+from listing_snapshot import ListingSnapshot, write_new_since_last_run
+from metrics import add_metrics_arguments, incr, timer, write_run_metrics
+from parallel_scoring import ScoringPool, add_workers_argument
+from posting_history import PostingHistory, add_history_argument, resume_name
+from resume_index import ResumeIndex, load_resumes
+from batch_report import write_batch_results
+from text_processing import print_stem_cache_stats
+
+SEARCH_URL = 'https://careers.adobe.com/us/en/search-results?offset={}'
+JOB_URL = 'https://careers.adobe.com/us/en/job/{}/{}'
+DDO_RE = re.compile(r'phApp\.ddo\s*=\s*(\{.*?\});\s*phApp\.', re.S)
+
+def extract_ddo(html):
+    """
+    Extracts the JSON data object the careers site embeds in its static HTML.
+
+    Returns:
+        dict: The page's `phApp.ddo` object, or None if it is not present.
+    """
+    match = DDO_RE.search(html)
+    return json.loads(match.group(1)) if match else None
+
+def add_matching_job(all_jobs, keywords, role, role_url, req_id, location):
+    """Appends the job to all_jobs if it is US-based and its role matches a keyword."""
+    # Check if the role name matches any keyword (broad match)
+    with timer("keyword_filter"):
+        role_match = keywords.matches(role) if role else False
+
+    if role and role_url and req_id and location and "United States" in location and role_match:
+        print(f"\nFound matching job:")
+        print(f"Role: {role}")
+        print(f"Location: {location}")
+        print(f"Req ID: {req_id}")
+        print(f"URL: {role_url}")
+
+        incr("jobs_matched")
+        all_jobs.append({
+            "role": role,
+            "role_url": role_url,
+            "req_id": req_id,
+            "location": location
+        })
+
+async def scrape_page_fast(page_num, all_jobs, keywords, client, url=SEARCH_URL):
+    """
+    Reads one search results page from the JSON embedded in its static HTML, without a browser.
 
-def setup_nltk():
-    """Setup NLTK by downloading required data."""
+    Args:
+        url: Search results URL template, formatted with the page offset
+
+    Returns:
+        bool: True if the page was parsed, False if the browser path is needed.
+    """
+    loop = asyncio.get_event_loop()
     try:
-        print("Starting NLTK setup...")
-        nltk.download('stopwords', quiet=True)
-        print("NLTK setup completed successfully")
+        response = await loop.run_in_executor(None, client.get, url.format(page_num))
+        response.raise_for_status()
+        with timer("listing_extract"):
+            jobs = extract_ddo(response.text)["eagerLoadRefineSearch"]["data"]["jobs"]
     except Exception as e:
-        print(f"Error during NLTK setup: {e}")
-
-async def scrape_page(page_num: int, all_jobs: List[Dict], keywords) -> None:
+        print(f"Fast path unavailable for page {page_num}, falling back to the browser: {e}")
+        return False
+
+    print(f"Found {len(jobs)} jobs on page {page_num}")
+    incr("listing_pages")
+    incr("jobs_listed", len(jobs))
+    for job in jobs:
+        role = job.get("title")
+        req_id = job.get("jobId") or job.get("reqId")
+        role_url = JOB_URL.format(req_id, re.sub(r'[^A-Za-z0-9]+', '-', role or '').strip('-')) if req_id else None
+        add_matching_job(all_jobs, keywords, role, role_url, req_id, job.get("location"))
+    return True
+
+async def scrape_page(page_num: int, all_jobs: List[Dict], keywords, pool: BrowserPool, client=None) -> None:
     """
-    Scrapes job postings from Adobe's careers page using Puppeteer.
+    Scrapes job postings from Adobe's careers page.
+
+    The static HTML is fetched over plain HTTP first when `client` is given;
+    the page is rendered with Puppeteer only if that fails.
 
     Args:
         page_num: Page number to scrape
         all_jobs: List to store found jobs
-        keywords: List of keywords to filter jobs
+        keywords: KeywordMatcher built from the keywords used to filter jobs
+        pool: Browser pool to take a tab from
+        client: Optional HttpClient enabling the fast path
     """
     print(f"\nStarting to scrape page {page_num}...")
+    if client and await scrape_page_fast(page_num, all_jobs, keywords, client):
+        print(f"Successfully processed page {page_num}")
+        return
     try:
-        browser = await launch(options={'timeout': 120000})
-        page = await browser.newPage()
-        await page.goto(f'https://careers.adobe.com/us/en/search-results?offset={page_num}', timeout=120000)
+        async with pool.page() as page:
+            with timer("navigation"):
+                await page.goto(SEARCH_URL.format(page_num), timeout=120000)
 
-        # Wait for the page to load completely
-        await page.waitForSelector('.jobs-list-item', timeout=120000)
-        html = await page.content()
-        # Close all pages before closing the browser
-        await asyncio.gather(*[page.close() for page in await browser.pages()])
-        await browser.close()
+            # Wait for the page to load completely
+            with timer("wait_for_selector"):
+                await page.waitForSelector('.jobs-list-item', timeout=120000)
+            html = await page.content()
+        incr("browser_html_bytes", len(html))
 
-        soup = BeautifulSoup(html, 'html.parser')
-        jobs = soup.find_all('li', class_='jobs-list-item')
+        jobs = extract_adobe_listings(html)
 
         print(f"Found {len(jobs)} jobs on page {page_num}")
+        incr("listing_pages")
+        incr("jobs_listed", len(jobs))
 
         for job in jobs:
-            try:
-                # Extract relevant job information
-                role_elem = job.find('a', {'data-ph-id': re.compile(r'ph-page-element-page15-iK3vh8')})
-                role = role_elem.find('div', class_='job-title').text.strip() if role_elem else None
-                role_url = role_elem['href'] if role_elem else None
-
-                req_id_elem = job.find('a', {'data-ph-id': re.compile(r'ph-page-element-page15-iK3vh8')})
-                req_id = req_id_elem['data-ph-at-job-id-text'] if req_id_elem else None
-
-                location_elem = job.find('span', {'data-ph-id': re.compile(r'ph-page-element-page15-4l6vaX')})
-                if location_elem:
-                    location_value_elem = location_elem.find('span', class_='job-location')
-                    if location_value_elem:
-                        location = location_value_elem.text.strip()
-                        # Trim "Location" and extra whitespace
-                        location = location.replace("Location", "").strip()
-                    else:
-                        location = None
-                else:
-                    location = None
-
-                # Check if the role name matches any keyword (broad match)
-                role_match = any(keyword.lower() in role.lower() for keyword in keywords) if role else False
-
-                if role and role_url and req_id and location and "United States" in location and role_match:
-                    print(f"\nFound matching job:")
-                    print(f"Role: {role}")
-                    print(f"Location: {location}")
-                    print(f"Req ID: {req_id}")
-                    print(f"URL: {role_url}")
-
-                    all_jobs.append({
-                        "role": role,
-                        "role_url": role_url,
-                        "req_id": req_id,
-                        "location": location
-                    })
-
-            except Exception as e:
-                print(f"Error processing job data: {e}")
-                continue
+            add_matching_job(all_jobs, keywords, job["role"], job["role_url"], job["req_id"], job["location"])
 
         print(f"Successfully processed page {page_num}")
     except Exception as e:
+        incr("fetch_errors")
         print(f"Error scraping page {page_num}: {e}")
 
-async def scrape_job_description(job):
+async def fetch_job_description_fast(job, client):
+    """
+    Reads the job description from the JSON embedded in the job page's static HTML.
+
+    Returns:
+        str: Job description text, or None if the browser path is needed.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        response = await loop.run_in_executor(None, client.get, job['role_url'])
+        response.raise_for_status()
+        with timer("description_extract"):
+            description_html = extract_ddo(response.text)["jobDetail"]["data"]["job"]["description"]
+            return html_to_text(description_html) or None
+    except Exception as e:
+        print(f"Fast path unavailable for {job['role_url']}, falling back to the browser: {e}")
+        return None
+
+async def scrape_job_description(job, pool, cache=None, limiter=None, client=None):
     """
     Scrapes the job description from the given job URL.
 
     Args:
         job: Job data dictionary containing the role_url.
+        pool: Browser pool to take a tab from.
+        cache: Optional JobCache consulted before and filled after the fetch.
+        limiter: Optional per-host rate limiter, only applied on a cache miss.
+        client: Optional HttpClient; the static page is tried before the browser.
 
     Returns:
         str: Job description text, or None if an error occurs.
     """
+    if cache:
+        description = cache.get("adobe", job['req_id'])
+        if description is not None:
+            return description
+    if limiter:
+        await limiter.wait(job['role_url'])
     try:
-        browser = await launch()
-        page = await browser.newPage()
-        await page.goto(job['role_url'])
-        await page.waitForSelector('div[data-ph-at-id="jobdescription-text"]')
-        description_element = await page.querySelector('div[data-ph-at-id="jobdescription-text"]')
-        description = await page.evaluate('(element) => element.textContent', description_element)
-        await browser.close()
+        description = await fetch_job_description_fast(job, client) if client else None
+        if description is None:
+            async with pool.page() as page:
+                with timer("navigation"):
+                    await page.goto(job['role_url'])
+                with timer("wait_for_selector"):
+                    await page.waitForSelector('div[data-ph-at-id="jobdescription-text"]')
+                description_element = await page.querySelector('div[data-ph-at-id="jobdescription-text"]')
+                description = await page.evaluate('(element) => element.textContent', description_element)
+        if description:
+            incr("descriptions_fetched")
+        if cache and description:
+            cache.put("adobe", job['req_id'], description, url=job['role_url'], title=job['role'])
         return description
     except Exception as e:
+        incr("fetch_errors")
         print(f"Error scraping job description for {job['role']} at {job['role_url']}: {e}")
         return None
 
-def calculate_match_score(job_description, resume_text):
+async def fetch_descriptions(all_jobs, pool, concurrency=5, limiter=None, cache=None, client=None):
     """
-    Calculates the match score between the job description and resume.
-
-    Args:
-        job_description: Job description text.
-        resume_text: Resume text.
+    Fetches the descriptions of all jobs concurrently.
 
     Returns:
-        float: Match score as a percentage.
+        list: (job, description) pairs for the jobs whose description was fetched, in order.
     """
-    # Preprocess text (lowercase, remove stop words, stemming)
-    ps = PorterStemmer()
-    stop_words = set(stopwords.words('english'))
-    job_keywords = set([ps.stem(word) for word in job_description.lower().split() if word not in stop_words])
-    resume_keywords = set([ps.stem(word) for word in resume_text.lower().split() if word not in stop_words])
-
-    # Calculate match score
-    common_keywords = job_keywords.intersection(resume_keywords)
-    match_score = len(common_keywords) / len(job_keywords) * 100 if job_keywords else 0
-    return match_score
+    descriptions = await gather_bounded(all_jobs, lambda job: scrape_job_description(job, pool, cache, limiter, client),
+                                        concurrency=concurrency)
+    return [(job, description) for job, description in zip(all_jobs, descriptions) if description]
 
-async def match_jobs_to_resume(all_jobs, resume_text):
+async def match_jobs_to_resume(all_jobs, resume_text, pool, concurrency=5, limiter=None, cache=None, client=None,
+                               dedupe_threshold=None, scoring_pool=None):
     """
     Matches the job roles to the resume and calculates match scores.
+    All fetched descriptions are scored in one TF-IDF batch, near-duplicates only once;
+    those get the role_url of the posting they were scored with as `duplicate_of`.
 
     Args:
         all_jobs: List of job data dictionaries.
         resume_text: Resume text.
+        pool: Browser pool used to fetch descriptions.
+        concurrency: Maximum number of descriptions fetched at once.
+        limiter: Optional per-host rate limiter for description requests.
+        cache: Optional JobCache of previously fetched descriptions.
+        client: Optional HttpClient enabling the no-browser fast path.
+        dedupe_threshold: Similarity above which descriptions are scored as one cluster (None disables).
+        scoring_pool: Optional ScoringPool built for this resume, scoring in worker processes.
 
     Returns:
         list: List of dictionaries containing job data and match scores.
     """
+    fetched = await fetch_descriptions(all_jobs, pool, concurrency, limiter, cache, client)
+    scoring_pool = scoring_pool or ScoringPool([ResumeIndex.from_text(resume_text)], workers=0)
+    scores, cluster_of = await scoring_pool.score_matrix([description for _, description in fetched],
+                                                         dedupe_threshold, return_clusters=True)
+    mark_duplicates([job for job, _ in fetched], cluster_of, "role_url")
     matched_jobs = []
-    for job in all_jobs:
-        job_description = await scrape_job_description(job)
-        if job_description:
-            match_score = calculate_match_score(job_description, resume_text)
-            job['match_score'] = f"{match_score:.2f}%"
-            matched_jobs.append(job)
+    for (job, _), match_score in zip(fetched, scores[0]):
+        job['match_score'] = f"{match_score:.2f}%"
+        matched_jobs.append(job)
+    print_stem_cache_stats()
     return matched_jobs
 
 def main():
@@ -165,17 +237,33 @@ def main():
     Main function to execute the scraping, matching, and saving process.
     """
     print("Starting the scraping process...")
-    setup_nltk()
 
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Scrape Adobe Careers page and filter jobs by keywords.")
     parser.add_argument("-k", "--keywords_file", default="keywords.txt", help="Path to the keywords file")
+    parser.add_argument("-r", "--resume", default="resume.txt", help="Path to the resume file")
+    parser.add_argument("--resumes", help="Directory of resumes or manifest file; scores every resume in one run")
+    parser.add_argument("--max-tabs", type=int, default=5, help="Maximum number of browser tabs open at once")
+    parser.add_argument("--recycle-after", type=int, default=50, help="Relaunch the browser after this many page loads")
+    parser.add_argument("--concurrency", type=int, default=5, help="Number of job descriptions fetched in parallel")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum requests per second per host (0 disables)")
+    add_cache_arguments(parser)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch and score postings that are new or changed since the last run")
+    parser.add_argument("--no-block-resources", action="store_true",
+                        help="Let the browser load images, fonts, media, stylesheets and trackers")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="Always render pages in the browser instead of reading the embedded JSON first")
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Score near-duplicate descriptions (MinHash similarity at least this) once (0 disables)")
+    add_workers_argument(parser)
+    add_metrics_arguments(parser)
+    add_history_argument(parser)
     args = parser.parse_args()
 
     # Load keywords from file
     try:
-        with open(args.keywords_file, 'r') as f:
-            keywords = [line.strip() for line in f]
+        keywords = KeywordMatcher.from_file(args.keywords_file)
     except FileNotFoundError:
         print(f"Error: Keywords file not found at {args.keywords_file}")
         return
@@ -185,7 +273,11 @@ def main():
 
     print("Beginning to scrape pages...")
     loop = asyncio.get_event_loop()
-    tasks = [scrape_page(page_num, all_jobs, keywords) for page_num in range(0, 100, 10)]
+    blocker = None if args.no_block_resources else ResourceBlocker()
+    pool = BrowserPool(max_tabs=args.max_tabs, recycle_after=args.recycle_after, blocker=blocker,
+                       options={'timeout': 120000})
+    client = None if args.browser_only else HttpClient(pool_size=max(10, args.concurrency))
+    tasks = [scrape_page(page_num, all_jobs, keywords, pool, client) for page_num in range(0, 100, 10)]
     loop.run_until_complete(asyncio.gather(*tasks))
 
     print(f"\nScraping completed. Found {len(all_jobs)} total jobs")
@@ -204,25 +296,75 @@ def main():
             print(f"Error saving initial scraping results: {e}")
 
         # Match jobs to resume and save results
-        with open('resume.txt', 'r') as f:
-            resume_text = f.read()
-
-        matched_jobs = loop.run_until_complete(match_jobs_to_resume(all_jobs, resume_text))
-
-        if matched_jobs:
+        snapshot = ListingSnapshot("adobe", "req_id", ["role", "role_url", "location"])
+        jobs_to_match = all_jobs
+        if args.incremental:
+            diff = snapshot.diff(all_jobs)
+            jobs_to_match = diff.added + diff.changed
+            print(f"Incremental run: {len(jobs_to_match)} new or changed jobs, {len(diff.unchanged)} unchanged")
+
+        limiter = HostRateLimiter(rate=args.rate)
+        cache = open_cache(args)
+        if args.resumes:
+            resumes = load_resumes(args.resumes)
+            scoring = ScoringPool(list(resumes.values()), args.workers)
+            fetched = loop.run_until_complete(
+                fetch_descriptions(jobs_to_match, pool, args.concurrency, limiter, cache, client))
+            matched_jobs = [job for job, _ in fetched]
+            if matched_jobs:
+                scores, cluster_of = loop.run_until_complete(
+                    scoring.score_matrix([description for _, description in fetched], args.dedupe_threshold,
+                                         return_clusters=True))
+                mark_duplicates(matched_jobs, cluster_of, "role_url")
+                write_batch_results(".", "adobe", list(resumes), matched_jobs, scores,
+                                    ["role", "role_url", "req_id", "location", "duplicate_of"], "req_id", timestamp)
+        else:
+            with open(args.resume, 'r') as f:
+                resume_text = f.read()
+            scoring = ScoringPool([ResumeIndex.from_text(resume_text)], args.workers)
+            matched_jobs = loop.run_until_complete(
+                match_jobs_to_resume(jobs_to_match, resume_text, pool, args.concurrency, limiter, cache, client,
+                                     args.dedupe_threshold, scoring))
+        scoring.close()
+        if cache:
+            print(f"Description cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+        if args.history:
+            with PostingHistory(args.history) as history:
+                history.record("adobe", all_jobs, None if args.resumes else resume_name(args.resume))
+                if args.resumes and matched_jobs:
+                    history.record_scores("adobe", matched_jobs, list(resumes), scores)
+
+        results_written = True
+        if args.incremental:
+            write_new_since_last_run(f"adobe_new_since_last_run_{timestamp}.csv", diff,
+                                     ["role", "role_url", "req_id", "location", "match_score", "duplicate_of"])
+        elif matched_jobs and not args.resumes:
             output_file = f"adobe_role_matched_{timestamp}.csv"
             try:
                 with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.DictWriter(f, fieldnames=["role", "role_url", "req_id", "location", "match_score"])
+                    writer = csv.DictWriter(f, fieldnames=["role", "role_url", "req_id", "location", "match_score",
+                                                           "duplicate_of"])
                     writer.writeheader()
                     writer.writerows(matched_jobs)
                 print(f"\nMatched jobs saved to {output_file}")
             except Exception as e:
+                results_written = False
                 print(f"Error saving matched jobs: {e}")
-        else:
+        elif not matched_jobs:
             print("No matching jobs found to save")
+
+        # Saved only once the results are written, so a run whose outputs fail sees the same postings again.
+        # Postings whose description could not be fetched stay out of the snapshot so they are retried
+        if results_written:
+            snapshot.save((diff.unchanged if args.incremental else []) + matched_jobs)
     else:
         print("No jobs were found to save")
 
+    loop.run_until_complete(pool.close())
+    if client:
+        client.close()
+    write_run_metrics(args, "adobe")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import csv
+import os
+import re
+
+
+def write_batch_results(output_dir, prefix, resume_names, jobs, scores, fieldnames, label_field, timestamp,
+                        score_field="match_score"):
+    """
+    Writes the outputs of a multi-resume run.
+
+    Produces one N x M score matrix (a row per resume, a column per job) and,
+    for every resume, a CSV of the jobs ranked by that resume's score.
+
+    Args:
+        output_dir: Directory the CSVs are written to.
+        prefix: File name prefix, e.g. "adobe".
+        resume_names: Resume names, in the row order of `scores`.
+        jobs: Job dicts, in the column order of `scores`.
+        scores: (resumes x jobs) array of match percentages.
+        fieldnames: Job fields copied into the ranked CSVs.
+        label_field: Job field used as the matrix column header.
+        timestamp: Date stamp appended to the file names.
+        score_field: Name of the score column in the ranked CSVs.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    matrix_path = os.path.join(output_dir, f"{prefix}_score_matrix_{timestamp}.csv")
+    with open(matrix_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["resume"] + [job[label_field] for job in jobs])
+        for name, row in zip(resume_names, scores):
+            writer.writerow([name] + [f"{score:.2f}" for score in row])
+    print(f"Score matrix for {len(resume_names)} resumes x {len(jobs)} jobs saved to {matrix_path}")
+
+    for name, row in zip(resume_names, scores):
+        ranked = sorted(zip(jobs, row), key=lambda pair: pair[1], reverse=True)
+        safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', name)
+        ranked_path = os.path.join(output_dir, f"{prefix}_{safe_name}_ranked_{timestamp}.csv")
+        with open(ranked_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames + [score_field])
+            writer.writeheader()
+            for job, score in ranked:
+                writer.writerow({**{k: job.get(k, "") for k in fieldnames}, score_field: round(float(score), 2)})
+    print(f"Ranked job lists written to {output_dir}")
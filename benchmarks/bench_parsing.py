@@ -0,0 +1,114 @@
+"""
+Micro-benchmark of the HTML parsing layer on the synthetic page fixtures
+(see make_fixtures.py).
+
+Compares the original full-document html.parser code paths with the
+html_parsing extractors (fast backend plus SoupStrainer subtree parsing).
+
+    python3 benchmarks/bench_parsing.py [-n 50]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parsing  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_adobe_listings(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    listings = []
+    for job in soup.find_all('li', class_='jobs-list-item'):
+        role_elem = job.find('a', {'data-ph-id': re.compile(r'ph-page-element-page15-iK3vh8')})
+        role = role_elem.find('div', class_='job-title').text.strip() if role_elem else None
+        role_url = role_elem['href'] if role_elem else None
+        req_id_elem = job.find('a', {'data-ph-id': re.compile(r'ph-page-element-page15-iK3vh8')})
+        req_id = req_id_elem['data-ph-at-job-id-text'] if req_id_elem else None
+        location_elem = job.find('span', {'data-ph-id': re.compile(r'ph-page-element-page15-4l6vaX')})
+        location_value_elem = location_elem.find('span', class_='job-location') if location_elem else None
+        location = location_value_elem.text.replace("Location", "").strip() if location_value_elem else None
+        listings.append({"role": role, "role_url": role_url, "req_id": req_id, "location": location})
+    return listings
+
+
+def legacy_dropbox_listings(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    listings = []
+    for listing in soup.select('li.open-positions__listing'):
+        link_element = listing.select_one('a.open-positions__listing-link')
+        if link_element:
+            link = link_element.get('href', '').strip()
+            if not link.startswith('http'):
+                link = 'https://jobs.dropbox.com' + link
+            title_element = link_element.select_one('.open-positions__listing-title')
+            listings.append({'title': title_element.text.strip() if title_element else '',
+                             'location': listing.get('data-location', '').strip(), 'link': link})
+    return listings
+
+
+def legacy_dropbox_description(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    element = soup.select_one(".job-description-details") or soup.select_one(".jc03-content")
+    return element.get_text(" ").strip() if element else ""
+
+
+def legacy_greenhouse_description(html):
+    soup = BeautifulSoup(html, "html.parser")
+    element = soup.find("div", class_="job__description")
+    return element.get_text(separator='\n', strip=True) if element else None
+
+
+CASES = [
+    ("adobe listings", "adobe_search.html", legacy_adobe_listings, html_parsing.extract_adobe_listings),
+    ("dropbox listings", "dropbox_all_jobs.html", legacy_dropbox_listings, html_parsing.extract_dropbox_listings),
+    ("dropbox description", "dropbox_job.html", legacy_dropbox_description,
+     html_parsing.extract_dropbox_description),
+    ("greenhouse description", "greenhouse_job.html", legacy_greenhouse_description,
+     html_parsing.extract_greenhouse_description),
+]
+
+
+def run(number):
+    """
+    Times every case and checks both paths extract the same data.
+
+    Returns:
+        list: One dict per case with per-call times in milliseconds.
+    """
+    results = []
+    for name, fixture, legacy, current in CASES:
+        html = load_fixture(fixture)
+        if legacy(html) != current(html):
+            print(f"warning: {name} extractors disagree on {fixture}")
+        legacy_ms = timeit.timeit(lambda: legacy(html), number=number) / number * 1000
+        current_ms = timeit.timeit(lambda: current(html), number=number) / number * 1000
+        results.append({"case": name, "legacy_ms": legacy_ms, "current_ms": current_ms,
+                        "speedup": legacy_ms / current_ms if current_ms else 0.0})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction on saved fixtures.")
+    parser.add_argument("-n", "--number", type=int, default=50, help="Iterations per case")
+    args = parser.parse_args()
+
+    print(f"Parser backend: {html_parsing.PARSER}")
+    print(f"{'case':<24}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for result in run(args.number):
+        print(f"{result['case']:<24}{result['legacy_ms']:>12.2f}{result['current_ms']:>12.2f}{result['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Checks HttpClient against a local stand-in server, no network needed.
+
+Covers the conditional GET path (200 with an ETag, then 304 served from the
+stored body), conditional=False bypassing the store, retries on 503 and 429
+with Retry-After, and eviction of the ETag store beyond its size cap.
+
+    python3 benchmarks/check_http_client.py
+"""
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from http_client import HttpClient  # noqa: E402
+
+ETAG = '"listing-v1"'
+LISTING_BODY = b'{"jobs": []}'
+
+
+class StandInServer:
+    """
+    /listing answers 304 to a matching If-None-Match and 200 with an ETag otherwise;
+    /flaky/<n>/<status> fails n times with <status> before answering 200.
+    Every request is recorded as (path, If-None-Match header).
+    """
+
+    def __init__(self):
+        server = self
+        self.requests = []
+        self.failures = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get("If-None-Match")))
+                if self.path.startswith("/listing"):
+                    if self.headers.get("If-None-Match") == ETAG:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.reply(200, LISTING_BODY, {"ETag": ETAG})
+                elif self.path.startswith("/flaky/"):
+                    _, _, count, status = self.path.split("/")
+                    seen = server.failures.get(self.path, 0)
+                    if seen < int(count):
+                        server.failures[self.path] = seen + 1
+                        self.reply(int(status), b"try again", {"Retry-After": "0"})
+                    else:
+                        self.reply(200, b"ok", {})
+                else:
+                    self.send_error(404)
+
+            def reply(self, status, body, headers):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check(condition, message):
+    print(("ok   " if condition else "FAIL ") + message)
+    return condition
+
+
+def main():
+    results = []
+    with StandInServer() as server, tempfile.TemporaryDirectory() as cache_dir:
+        client = HttpClient(cache_dir=cache_dir, backoff=0, retries=3)
+        listing = server.base_url + "/listing"
+
+        first = client.get(listing)
+        second = client.get(listing)
+        results.append(check(first.status_code == 200 and not first.from_cache, "first GET is a plain 200"))
+        results.append(check(server.requests[-1] == ("/listing", ETAG), "second GET sends If-None-Match"))
+        results.append(check(second.status_code == 200 and second.from_cache and second.content == LISTING_BODY,
+                             "304 is served from the stored body"))
+
+        unconditional = client.get(listing + "?page=2", conditional=False)
+        client.get(listing + "?page=2", conditional=False)
+        results.append(check(server.requests[-1] == ("/listing?page=2", None) and not unconditional.from_cache,
+                             "conditional=False neither stores nor revalidates"))
+
+        for status in (503, 429):
+            response = client.get(f"{server.base_url}/flaky/2/{status}")
+            attempts = sum(1 for path, _ in server.requests if path == f"/flaky/2/{status}")
+            results.append(check(response.status_code == 200 and attempts == 3,
+                                 f"{status} is retried until it succeeds ({attempts} attempts)"))
+        response = client.get(f"{server.base_url}/flaky/9/503")
+        results.append(check(response.status_code == 503, "gives up after the retry budget"))
+
+        client.cache_max_bytes = 1
+        removed = client.evict()
+        results.append(check(removed == 1 and not os.listdir(cache_dir), "evict() enforces the size cap"))
+        client.close()
+
+    print(f"{sum(results)}/{len(results)} checks passed")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Generates the synthetic page fixtures in benchmarks/fixtures/.
+
+No page in the fixtures was captured from a live site: each one reproduces
+the markup the parsers look for (Adobe search results and job pages with
+their embedded phApp.ddo JSON, the Dropbox all-jobs and job pages, a
+Greenhouse job page and the Greenhouse jobs API), padded with navigation,
+footer and inline-script noise of realistic size. All text is drawn at
+random from the generic job-posting vocabulary below, with a fixed seed, so
+the files are reproducible and carry no personal data.
+
+    python3 benchmarks/make_fixtures.py
+"""
+import json
+import os
+import random
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEED = 7
+
+VOCABULARY = """
+about accessibility accountable achieve across actionable adoption agile algorithms align analysis analytical
+analytics analyze applications apply architecture audiences automation available backend balance benefits best
+build business campaigns candidates career challenges changes cloud coaching code collaborate collaboration
+communicate communication community company compensation complex compliance computer concepts configuration
+consumer content continuous contribute coordinate cross-functional culture customer customers dashboards data
+database decisions define degree deliver delivery demonstrated deploy design develop development devices digital
+distributed diverse documentation drive driven ecosystem effective efficiency employees enable engagement
+engineering engineers ensure environment equal equivalent established evaluate excellent execute experience
+experiments expertise features feedback financial flexible focus forecasting framework functional games global
+goals growth guidance hands-on health help high-quality hybrid identify impact implement improve inclusive
+independently industry influence information infrastructure initiatives innovation insights integration
+interpersonal iterate java knowledge launch lead leadership learning leverage lifecycle manage management market
+marketing measure mentor methodologies metrics mission mobile models modern monitor motivated multiple network
+office operations opportunity optimize organization outcomes ownership paid partner partners passion people
+performance pipelines planning platform players policies practices prioritize problem problems process processes
+product production professional proficiency program programming projects proven python quality quantitative
+questions reporting requirements research resources responsibilities results review roadmap role scalable
+scale security senior services skills software solutions solve stakeholders standards statistics strategic
+strategy strong success support systems teams technical technologies testing tools track training trends
+understanding users validate value vision visualization welcome workflows working world written years
+""".split()
+TITLES = ["Senior Data Analyst", "Product Manager", "Machine Learning Engineer", "Business Intelligence Analyst",
+          "Software Engineer", "Marketing Analytics Manager", "Data Scientist", "Customer Success Manager",
+          "Analytics Engineer", "Technical Program Manager"]
+ADOBE_LOCATIONS = ["San Jose, California, United States of America", "Seattle, Washington, United States of America",
+                   "Bangalore, India", "London, United Kingdom", "New York, New York, United States of America"]
+DROPBOX_LOCATIONS = ["Remote - US: Select locations", "Remote - Canada", "Remote - Poland", "San Francisco, CA, US"]
+GREENHOUSE_TITLES = TITLES + ["Principal Insights Analyst", "Product Manager, Platform", "Game Designer", "QA Tester",
+                              "Software Engineer II"]
+GREENHOUSE_LOCATIONS = ["San Mateo, California, United States", "Aliso Viejo, California, United States",
+                        "San Diego, California, United States", "Remote, United States", "Tokyo, Japan",
+                        "London, United Kingdom"]
+GREENHOUSE_DEPARTMENTS = ["Studio Operations", "Data & Analytics", "Platform Engineering", "Marketing",
+                          "Global Product"]
+
+
+class FixtureWriter:
+    def __init__(self, seed=SEED):
+        self.rng = random.Random(seed)
+
+    def para(self, n):
+        return " ".join(self.rng.choice(VOCABULARY) for _ in range(n))
+
+    def chrome(self, body, scripts=8):
+        """Wraps `body` in the navigation, footer and inline scripts of a typical careers page."""
+        nav = "".join(f'<li class="nav-item"><a href="/us/en/c/{i}" data-ph-id="nav-{i}">{self.para(3)}</a></li>'
+                      for i in range(120))
+        foot = "".join(f'<div class="footer-col"><h4>{self.para(2)}</h4><ul>'
+                       + "".join(f'<li><a href="/f/{i}/{j}">{self.para(2)}</a></li>' for j in range(15))
+                       + '</ul></div>' for i in range(8))
+        js = "".join(f'<script>window.__cfg{i} = {json.dumps({"k": [self.para(8) for _ in range(30)]})};</script>'
+                     for i in range(scripts))
+        return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Careers</title>{js}'
+                f'<link rel="stylesheet" href="/s.css"></head><body><header><nav><ul>{nav}</ul></nav></header>'
+                f'<main>{body}</main><footer>{foot}</footer></body></html>')
+
+    def description_html(self):
+        return "".join(f"<p>{self.para(60)}</p><ul>" + "".join(f"<li>{self.para(12)}</li>" for _ in range(6))
+                       + "</ul>" for _ in range(5))
+
+    def adobe_search(self):
+        items, ddo_jobs = [], []
+        for i in range(10):
+            title, location, req_id = self.rng.choice(TITLES), self.rng.choice(ADOBE_LOCATIONS), f"R15{1000 + i}"
+            items.append(
+                f'<li class="jobs-list-item" data-ph-at-id="jobs-list-item"><div class="information">'
+                f'<span role="heading"><a href="https://careers.adobe.com/us/en/job/{req_id}/{title.replace(" ", "-")}" '
+                f'data-ph-id="ph-page-element-page15-iK3vh8" data-ph-at-job-id-text="{req_id}">'
+                f'<div class="job-title"><span>{title}</span></div></a></span>'
+                f'<p class="job-info"><span data-ph-id="ph-page-element-page15-4l6vaX"><span class="job-location">'
+                f'<span class="sr-only">Location</span>{location}</span></span>'
+                f'<span class="job-category">{self.para(2)}</span></p>'
+                f'<p class="job-description">{self.para(40)}</p></div></li>')
+            ddo_jobs.append({"title": title, "jobId": req_id, "reqId": req_id, "location": location,
+                             "descriptionTeaser": self.para(30)})
+        ddo = {"eagerLoadRefineSearch": {"status": 200, "totalHits": 1200, "data": {"jobs": ddo_jobs}}}
+        body = f'<section class="search-results"><ul data-ph-at-id="jobs-list">{"".join(items)}</ul></section>'
+        return self.with_ddo(self.chrome(body), ddo)
+
+    def adobe_job(self, description):
+        ddo = {"jobDetail": {"status": 200, "data": {"job": {"title": "Senior Data Analyst", "jobId": "R151000",
+                                                             "description": description}}}}
+        body = f'<section class="job-description"><div data-ph-at-id="jobdescription-text">{description}</div></section>'
+        return self.with_ddo(self.chrome(body), ddo)
+
+    @staticmethod
+    def with_ddo(page, ddo):
+        return page.replace("</body>", f'<script>phApp.ddo = {json.dumps(ddo)}; phApp.sessionParams = {{}};</script>'
+                                       f'</body>')
+
+    def dropbox_all_jobs(self):
+        items = []
+        for i in range(150):
+            title, location = self.rng.choice(TITLES), self.rng.choice(DROPBOX_LOCATIONS)
+            items.append(f'<li class="open-positions__listing" data-location="{location}" '
+                         f'data-department="{self.para(1)}">'
+                         f'<a class="open-positions__listing-link" href="/listing/{6000000 + i}">'
+                         f'<h5 class="open-positions__listing-title">{title}</h5>'
+                         f'<p class="open-positions__listing-meta">{location}</p></a></li>')
+        return self.chrome(f'<section class="open-positions"><ul>{"".join(items)}</ul></section>')
+
+    def dropbox_job(self, description):
+        return self.chrome(f'<article><h1>Senior Data Analyst</h1>'
+                           f'<div class="job-description-details">{description}</div></article>')
+
+    def greenhouse_job(self, description):
+        return self.chrome(f'<div class="job__header"><h1>Senior Data Analyst</h1></div>'
+                           f'<div class="job__description body">{description}</div>', scripts=3)
+
+    def greenhouse_jobs(self, count=50):
+        jobs = []
+        for i in range(count):
+            jobs.append({
+                "absolute_url": f"https://job-boards.greenhouse.io/sonyinteractiveentertainmentglobal/jobs/{5000000 + i}",
+                "data_compliance": [{"type": "gdpr", "requires_consent": False, "requires_processing_consent": False,
+                                     "requires_retention_consent": False, "retention_period": None}],
+                "internal_job_id": 4000000 + i,
+                "location": {"name": self.rng.choice(GREENHOUSE_LOCATIONS)},
+                "metadata": [
+                    {"id": 1, "name": "Career Page - Department", "value": self.rng.choice(GREENHOUSE_DEPARTMENTS),
+                     "value_type": "single_select"},
+                    {"id": 2, "name": "Employment Type", "value": "Full-time", "value_type": "single_select"},
+                ],
+                "id": 5000000 + i,
+                "updated_at": "2026-10-01T10:00:00-04:00",
+                "requisition_id": f"JR{10000 + i}",
+                "title": self.rng.choice(GREENHOUSE_TITLES),
+                "company_name": "Sony Interactive Entertainment",
+                "first_published": "2026-09-01T09:00:00-04:00",
+            })
+        return json.dumps({"jobs": jobs, "meta": {"total": count}}, indent=1)
+
+
+def main():
+    writer = FixtureWriter()
+    description = writer.description_html()
+    pages = {
+        "adobe_search.html": writer.adobe_search(),
+        "adobe_job.html": writer.adobe_job(description),
+        "dropbox_all_jobs.html": writer.dropbox_all_jobs(),
+        "dropbox_job.html": writer.dropbox_job(description),
+        "greenhouse_job.html": writer.greenhouse_job(description),
+        "greenhouse_jobs.json": writer.greenhouse_jobs(),
+    }
+    os.makedirs(FIXTURES, exist_ok=True)
+    for name, content in pages.items():
+        with open(os.path.join(FIXTURES, name), "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"Wrote {name} ({len(content)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Offline benchmark suite for every stage of the three scrapers.
+
+The synthetic page fixtures in benchmarks/fixtures/ (see make_fixtures.py)
+are scaled up to the requested number of postings and, where a stage talks
+to the network, served by a local stand-in HTTP server. Results are written as JSON so runs can be
+compared across commits. Process-pool scoring is timed once per --workers
+count (stage score_workers_<n>, 0 being the in-process baseline) to show how
+it scales with cores.
+
+    python3 benchmarks/run_benchmarks.py --sizes 1000 10000 100000 -o bench.json
+    python3 benchmarks/run_benchmarks.py --sizes 10000 --boards psn --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import contextlib
+import html
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import adobe_scaper_analyzer as adobe  # noqa: E402
+import dropbox_scraper_analyzer as dropbox  # noqa: E402
+import html_parsing  # noqa: E402
+import psn_scraper_analyzer as psn  # noqa: E402
+from concurrent_fetch import map_threaded  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from parallel_scoring import ScoringPool  # noqa: E402
+from resume_index import ResumeIndex  # noqa: E402
+from text_processing import stem, stem_tokens  # noqa: E402
+from tfidf_scoring import TfidfScorer  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+KEYWORDS_FILE = os.path.join(ROOT, "keywords.txt")
+RESUME_FILE = os.path.join(ROOT, "resume.txt")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_greenhouse_jobs(size, base_url, content=None):
+    """
+    Repeats the fixture Greenhouse jobs with fresh ids until there are `size` postings.
+
+    Args:
+        content: Description HTML to attach to every job, escaped as the board
+            API returns it with `content=true`.
+    """
+    fixture_jobs = json.loads(load_fixture("greenhouse_jobs.json"))["jobs"]
+    jobs = []
+    for i in range(size):
+        job = dict(fixture_jobs[i % len(fixture_jobs)])
+        job["id"] = 9000000 + i
+        job["absolute_url"] = f"{base_url}/greenhouse/jobs/{job['id']}"
+        if content is not None:
+            job["content"] = content
+        jobs.append(job)
+    return jobs
+
+
+class FixtureServer:
+    """
+    Local stand-in for the job boards, serving the fixtures on an ephemeral port.
+
+    /greenhouse/jobs?n=N returns N scaled Greenhouse postings and /greenhouse/jobs/<id>
+    the Greenhouse job page; /dropbox/jobs?n=N returns them with their descriptions,
+    as the Dropbox board API does. /adobe/us/en/search-results?offset=N and
+    /adobe/us/en/job/<id>/<slug> return the Adobe search and job pages.
+    """
+
+    def __init__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/greenhouse/jobs":
+                    size = int(parse_qs(url.query).get("n", ["50"])[0])
+                    body = json.dumps({"jobs": scale_greenhouse_jobs(size, server.base_url)}).encode("utf-8")
+                    content_type = "application/json"
+                elif url.path == "/dropbox/jobs":
+                    size = int(parse_qs(url.query).get("n", ["50"])[0])
+                    jobs = scale_greenhouse_jobs(size, server.base_url, server.description_content)
+                    body, content_type = json.dumps({"jobs": jobs}).encode("utf-8"), "application/json"
+                elif url.path.startswith("/greenhouse/jobs/"):
+                    body, content_type = server.pages["greenhouse_job.html"], "text/html; charset=utf-8"
+                elif url.path == "/adobe/us/en/search-results":
+                    body, content_type = server.pages["adobe_search.html"], "text/html; charset=utf-8"
+                elif url.path.startswith("/adobe/us/en/job/"):
+                    body, content_type = server.pages["adobe_job.html"], "text/html; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.pages = {name: load_fixture(name).encode("utf-8")
+                      for name in ("greenhouse_job.html", "adobe_search.html", "adobe_job.html")}
+        self.description_content = html.escape(adobe_description_html(load_fixture("adobe_job.html")))
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def adobe_description_html(job_html):
+    return adobe.extract_ddo(job_html)["jobDetail"]["data"]["job"]["description"]
+
+
+def synthetic_descriptions(text, size, seed=0):
+    """Builds `size` descriptions by resampling the words of a fixture description."""
+    rng = random.Random(seed)
+    words = re.findall(r"\w+", text)
+    # Rare made-up terms keep the vocabulary growing with the corpus, as real postings do
+    return [" ".join(rng.choice(words) for _ in range(250)) + f" term{rng.randrange(size * 5)}" for _ in range(size)]
+
+
+def synthetic_titles(size, seed=0):
+    rng = random.Random(seed)
+    with open(KEYWORDS_FILE, "r", encoding="utf-8") as f:
+        keywords = [line.strip() for line in f if line.strip()]
+    fillers = ["Software Engineer", "Chef", "Account Executive", "Recruiter", "Game Designer", "QA Tester"]
+    prefixes = ["", "Senior ", "Staff ", "Lead ", "Principal "]
+    return [rng.choice(prefixes) + rng.choice(keywords + fillers * 20) + rng.choice(["", " II", ", Games"])
+            for _ in range(size)]
+
+
+class Recorder:
+    def __init__(self):
+        self.results = []
+
+    def time(self, board, stage, size, items, func):
+        """Runs func once and records its wall time; `items` is how many postings it processed."""
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        self.results.append({"board": board, "stage": stage, "size": size, "items": items,
+                             "seconds": round(seconds, 6),
+                             "per_item_us": round(seconds / items * 1e6, 3) if items else 0.0})
+        print(f"{board:<8}{stage:<22}{size:>8}{items:>8}{seconds:>10.3f}s", file=sys.stderr)
+
+
+def bench_text_stages(recorder, board, size, description_text, resume_index):
+    descriptions = synthetic_descriptions(description_text, size)
+    titles = synthetic_titles(size)
+    matcher = KeywordMatcher.from_file(KEYWORDS_FILE)
+    recorder.time(board, "keyword_filter", size, size, lambda: [matcher.matches(title) for title in titles])
+    stem.cache_clear()
+    recorder.time(board, "tokenize_stem", size, size, lambda: [stem_tokens(text) for text in descriptions])
+    recorder.time(board, "score", size, size, lambda: TfidfScorer(descriptions).score([resume_index]))
+
+
+def bench_scoring_workers(recorder, size, description_text, resume_index, workers_counts):
+    """Times ScoringPool.score_matrix_sync, pool start-up included, for each number of workers."""
+    descriptions = synthetic_descriptions(description_text, size)
+    for workers in [0] + [count for count in workers_counts if count > 0]:
+        stem.cache_clear()
+
+        def run():
+            with ScoringPool([resume_index], workers) as pool:
+                pool.score_matrix_sync(descriptions)
+
+        recorder.time("scoring", f"score_workers_{workers}", size, size, run)
+
+
+def default_workers_counts():
+    """1, 2, 4, ... up to the number of CPUs, plus the CPU count itself."""
+    cpus = os.cpu_count() or 1
+    counts = {cpus}
+    count = 1
+    while count < cpus:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def run_all(coroutines):
+    async def gather():
+        return await asyncio.gather(*coroutines)
+    return asyncio.run(gather())
+
+
+def bench_adobe(recorder, size, page_cap, resume_index, server):
+    search_html = load_fixture("adobe_search.html")
+    job_html = load_fixture("adobe_job.html")
+    pages = min(max(1, size // 10), page_cap)
+    client = HttpClient()
+    keywords = KeywordMatcher.from_file(KEYWORDS_FILE)
+    search_url = server.base_url + "/adobe/us/en/search-results?offset={}"
+    jobs = []
+    recorder.time("adobe", "listing_fetch_fast", size, pages * 10,
+                  lambda: run_all([adobe.scrape_page_fast(page * 10, jobs, keywords, client, url=search_url)
+                                   for page in range(pages)]))
+    items = min(len(jobs), page_cap)
+    for job in jobs[:items]:
+        job["role_url"] = job["role_url"].replace("https://careers.adobe.com", server.base_url + "/adobe")
+    recorder.time("adobe", "description_fetch_fast", size, items,
+                  lambda: run_all([adobe.fetch_job_description_fast(job, client) for job in jobs[:items]]))
+    client.close()
+    recorder.time("adobe", "listing_parse_html", size, pages * 10,
+                  lambda: [html_parsing.extract_adobe_listings(search_html) for _ in range(pages)])
+    recorder.time("adobe", "listing_parse_json", size, pages * 10,
+                  lambda: [adobe.extract_ddo(search_html)["eagerLoadRefineSearch"]["data"]["jobs"]
+                           for _ in range(pages)])
+    items = min(size, page_cap)
+    recorder.time("adobe", "description_extract", size, items,
+                  lambda: [html_parsing.html_to_text(adobe_description_html(job_html)) for _ in range(items)])
+    description = html_parsing.html_to_text(adobe_description_html(job_html))
+    bench_text_stages(recorder, "adobe", size, description, resume_index)
+
+
+def bench_dropbox(recorder, size, page_cap, resume_index, server):
+    client = HttpClient()
+    recorder.time("dropbox", "listing_api_fast", size, size,
+                  lambda: asyncio.run(dropbox.fetch_jobs_api(client, url=f"{server.base_url}/dropbox/jobs?n={size}")))
+    client.close()
+    listing_html = load_fixture("dropbox_all_jobs.html")
+    job_html = load_fixture("dropbox_job.html")
+    per_page = len(html_parsing.extract_dropbox_listings(listing_html))
+    pages = min(max(1, size // per_page), page_cap)
+    recorder.time("dropbox", "listing_parse_html", size, pages * per_page,
+                  lambda: [html_parsing.extract_dropbox_listings(listing_html) for _ in range(pages)])
+    items = min(size, page_cap)
+    recorder.time("dropbox", "description_extract", size, items,
+                  lambda: [html_parsing.extract_dropbox_description(job_html) for _ in range(items)])
+    bench_text_stages(recorder, "dropbox", size, html_parsing.extract_dropbox_description(job_html), resume_index)
+
+
+def bench_psn(recorder, size, page_cap, resume_index, server):
+    client = HttpClient()
+    url = f"{server.base_url}/greenhouse/jobs?n={size}"
+    jobs = []
+    recorder.time("psn", "listing_api_filter", size, size,
+                  lambda: psn.scrape_sony_careers(jobs, KEYWORDS_FILE, client, url=url))
+    items = min(len(jobs), page_cap)
+    with tempfile.TemporaryDirectory() as output_folder:
+        recorder.time("psn", "description_fetch", size, items,
+                      lambda: map_threaded(jobs[:items],
+                                           lambda job: psn.scrape_job_description(job, output_folder, client),
+                                           concurrency=8))
+    job_html = load_fixture("greenhouse_job.html")
+    recorder.time("psn", "description_extract", size, min(size, page_cap),
+                  lambda: [html_parsing.extract_greenhouse_description(job_html) for _ in range(min(size, page_cap))])
+    client.close()
+    bench_text_stages(recorder, "psn", size, html_parsing.extract_greenhouse_description(job_html), resume_index)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Numbers of postings to simulate")
+    parser.add_argument("--boards", nargs="+", choices=["adobe", "dropbox", "psn"], default=["adobe", "dropbox", "psn"])
+    parser.add_argument("--page-cap", type=int, default=500,
+                        help="Maximum pages parsed or fetched per HTML/HTTP stage; per-item times extrapolate")
+    parser.add_argument("--workers", type=int, nargs="*", default=default_workers_counts(),
+                        help="Worker process counts to time scoring with (default: powers of two up to the CPU "
+                             "count); pass no values to skip")
+    parser.add_argument("-o", "--output", help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    resume_index = ResumeIndex.load(RESUME_FILE, index_dir=None)
+    recorder = Recorder()
+    # The scrapers print progress as they go; only the JSON report may reach stdout
+    with FixtureServer() as server, contextlib.redirect_stdout(sys.stderr):
+        for size in args.sizes:
+            if "adobe" in args.boards:
+                bench_adobe(recorder, size, args.page_cap, resume_index, server)
+            if "dropbox" in args.boards:
+                bench_dropbox(recorder, size, args.page_cap, resume_index, server)
+            if "psn" in args.boards:
+                bench_psn(recorder, size, args.page_cap, resume_index, server)
+            if args.workers:
+                bench_scoring_workers(recorder, size,
+                                      html_parsing.extract_greenhouse_description(load_fixture("greenhouse_job.html")),
+                                      resume_index, args.workers)
+
+    report = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "html_parser": html_parsing.PARSER, "cpu_count": os.cpu_count(), "results": recorder.results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
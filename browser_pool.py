@@ -0,0 +1,201 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from metrics import incr
+
+ALLOWED_RESOURCE_TYPES = frozenset(["document", "xhr", "fetch", "script"])
+BLOCKED_DOMAINS = frozenset([
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "facebook.com", "connect.facebook.net", "linkedin.com", "licdn.com", "bing.com",
+    "hotjar.com", "segment.io", "segment.com", "optimizely.com", "newrelic.com", "nr-data.net",
+    "demdex.net", "omtrdc.net", "everesttech.net", "adobedtm.com", "twitter.com", "ads-twitter.com",
+    "onetrust.com", "cookielaw.org", "qualtrics.com", "clarity.ms", "fullstory.com",
+])
+
+
+class ResourceBlocker:
+    """
+    Request interception policy applied to every tab a BrowserPool opens.
+
+    Only resource types in `allowed_types` are loaded, and requests to
+    `blocked_domains` (or their subdomains) are aborted whatever their type.
+    Allowed and blocked requests are counted for the end-of-run report.
+    """
+
+    def __init__(self, allowed_types=ALLOWED_RESOURCE_TYPES, blocked_domains=BLOCKED_DOMAINS):
+        self.allowed_types = frozenset(allowed_types)
+        self.blocked_domains = frozenset(blocked_domains)
+        self.allowed = 0
+        self.blocked = Counter()
+
+    def _is_blocked_host(self, url):
+        host = urlparse(url).hostname or ""
+        parts = host.split(".")
+        return any(".".join(parts[i:]) in self.blocked_domains for i in range(len(parts) - 1))
+
+    async def handle(self, request):
+        try:
+            if request.resourceType not in self.allowed_types:
+                self.blocked[request.resourceType] += 1
+                incr("browser_requests_blocked")
+                await request.abort()
+            elif self._is_blocked_host(request.url):
+                self.blocked["tracker"] += 1
+                incr("browser_requests_blocked")
+                await request.abort()
+            else:
+                self.allowed += 1
+                incr("browser_requests_allowed")
+                await request.continue_()
+        except Exception:
+            # The request may already have been handled if its page was closed
+            pass
+
+    async def attach(self, page):
+        await page.setRequestInterception(True)
+        page.on('request', lambda request: asyncio.ensure_future(self.handle(request)))
+
+    def report(self):
+        blocked = sum(self.blocked.values())
+        details = ", ".join(f"{kind}: {count}" for kind, count in self.blocked.most_common())
+        print(f"Browser requests: {self.allowed} allowed, {blocked} blocked" + (f" ({details})" if details else ""))
+
+
+class BrowserPool:
+    """
+    Shares one long-lived headless Chromium between many scraping tasks.
+
+    Tabs are handed out through `page()`, at most `max_tabs` at a time. After
+    `recycle_after` checkouts the browser is retired: new tabs go to a freshly
+    launched browser while the old one is closed once its last tab is released.
+    A browser that crashes or disconnects is dropped and relaunched on the next
+    checkout. When a `blocker` is given, every tab is opened with its request
+    interception applied.
+    """
+
+    def __init__(self, max_tabs=5, recycle_after=50, blocker=None, **launch_options):
+        self.max_tabs = max_tabs
+        self.recycle_after = recycle_after
+        self.blocker = blocker
+        self.launch_options = launch_options
+        self._semaphore = asyncio.Semaphore(max_tabs)
+        self._launch_lock = asyncio.Lock()
+        self._browser = None
+        self._uses = 0
+        self._active = {}
+        self._retired = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _launch(self):
+        """Launches a new browser and drops it from the pool if it disconnects."""
+        # Imported here so runs that never need a browser do not pay for pyppeteer
+        from pyppeteer import launch
+
+        print("Launching headless browser...")
+        browser = await launch(**self.launch_options)
+        incr("browser_launches")
+        browser.on('disconnected', lambda: self._on_disconnected(browser))
+        self._browser = browser
+        self._uses = 0
+        self._active[browser] = 0
+        return browser
+
+    def _on_disconnected(self, browser):
+        if self._browser is browser:
+            print("Browser disconnected, it will be relaunched on next use")
+            self._browser = None
+        self._retired.discard(browser)
+        self._active.pop(browser, None)
+
+    async def _get_browser(self):
+        """
+        Returns the current browser with one more tab checked out on it.
+
+        The checkout is counted under the launch lock, before any await on the
+        browser, so a concurrent recycle never closes a browser that is still
+        opening a tab. Every call must be paired with `_release`.
+        """
+        async with self._launch_lock:
+            if self._browser is not None and self._uses >= self.recycle_after:
+                old = self._browser
+                self._browser = None
+                self._retired.add(old)
+                if not self._active.get(old):
+                    await self._close_browser(old)
+            if self._browser is None:
+                await self._launch()
+            self._uses += 1
+            self._active[self._browser] = self._active.get(self._browser, 0) + 1
+            return self._browser
+
+    async def _release(self, browser):
+        """Ends a checkout, closing the browser if it is retired and this was its last tab."""
+        if browser in self._active:
+            self._active[browser] -= 1
+            if browser in self._retired and not self._active[browser]:
+                await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        self._retired.discard(browser)
+        self._active.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
+
+    async def _new_page(self):
+        """Opens a tab, relaunching the browser once if it has crashed."""
+        browser = await self._get_browser()
+        try:
+            return browser, await browser.newPage()
+        except Exception as e:
+            print(f"Error opening tab, relaunching browser: {e}")
+            if self._browser is browser:
+                self._browser = None
+            await self._release(browser)
+        browser = await self._get_browser()
+        try:
+            return browser, await browser.newPage()
+        except Exception:
+            await self._release(browser)
+            raise
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Checks out a tab from the pool.
+
+        Yields:
+            Page: A new pyppeteer page, closed automatically on exit.
+        """
+        async with self._semaphore:
+            browser, page = await self._new_page()
+            incr("browser_pages")
+            try:
+                if self.blocker:
+                    await self.blocker.attach(page)
+                yield page
+            finally:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+                await self._release(browser)
+
+    async def close(self):
+        """Closes every browser owned by the pool."""
+        browsers = set(self._retired) | set(self._active)
+        if self._browser is not None:
+            browsers.add(self._browser)
+        self._browser = None
+        for browser in browsers:
+            await self._close_browser(browser)
+        if self.blocker and (self.blocker.allowed or self.blocker.blocked):
+            self.blocker.report()
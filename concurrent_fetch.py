@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket shared by async tasks and worker threads.
+
+    Each host gets `burst` tokens refilled at `rate` tokens per second. Callers
+    reserve a token and sleep for the returned delay, so the bucket itself
+    never blocks and works the same from asyncio and from a thread pool.
+    """
+
+    def __init__(self, rate=2.0, burst=2):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def _reserve(self, url):
+        """Takes one token for the url's host and returns how long to wait for it."""
+        if not self.rate:
+            return 0.0
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[host] = (tokens, now)
+        return -tokens / self.rate if tokens < 0 else 0.0
+
+    async def wait(self, url):
+        delay = self._reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def wait_sync(self, url):
+        delay = self._reserve(url)
+        if delay:
+            time.sleep(delay)
+
+
+async def gather_bounded(items, fetch, concurrency=5, limiter=None, url_of=None):
+    """
+    Runs an async fetch over every item with at most `concurrency` in flight.
+
+    Args:
+        items: Items to fetch (e.g. job dicts).
+        fetch: Coroutine function taking one item.
+        concurrency: Maximum number of fetches running at once.
+        limiter: Optional HostRateLimiter applied before each fetch.
+        url_of: Function returning the url of an item, used by the limiter.
+
+    Returns:
+        list: Fetch results in the same order as `items`.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            if limiter and url_of:
+                await limiter.wait(url_of(item))
+            return await fetch(item)
+
+    return await asyncio.gather(*[run(item) for item in items])
+
+
+def map_threaded(items, fetch, concurrency=5, limiter=None, url_of=None):
+    """
+    Thread-pool counterpart of gather_bounded for blocking fetch functions.
+
+    Returns:
+        list: Fetch results in the same order as `items`.
+    """
+    def run(item):
+        if limiter and url_of:
+            limiter.wait_sync(url_of(item))
+        return fetch(item)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(executor.map(run, items))
@@ -0,0 +1,167 @@
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from metrics import incr, timer
+
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_MULTIPLIER = np.uint64(1000003)
+
+
+@lru_cache(maxsize=65536)
+def _word_hash(word):
+    return zlib.crc32(word.encode("utf-8"))
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles.
+
+    Each lowercased text is split on whitespace into overlapping
+    `shingle_size`-word shingles, whose hashes are rolled from per-word crc32
+    values with numpy, and reduced to
+    `num_perm` minimums of random multiply-shift hash functions
+    ((a * x + b) mod 2^64) >> 32. The share of equal signature positions
+    between two texts estimates the Jaccard similarity of their shingle sets.
+    """
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = (rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64) << np.uint64(32)
+                   | rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._b = (rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64) << np.uint64(32))[:, None]
+
+    def shingles(self, text):
+        """Returns the distinct shingle hashes of text as a uint64 array."""
+        words = np.array(list(map(_word_hash, text.lower().split())), dtype=np.uint64)
+        size = min(self.shingle_size, len(words))
+        if size == 0:
+            return np.zeros(1, dtype=np.uint64)
+        count = len(words) - size + 1
+        hashes = words[:count].copy()
+        for offset in range(1, size):
+            hashes = hashes * SHINGLE_MULTIPLIER + words[offset:offset + count]
+        return np.unique(hashes)
+
+    def signature(self, text):
+        return ((self._a * self.shingles(text) + self._b) >> np.uint64(32)).min(axis=1)
+
+    def signatures(self, texts, chunk_size=256):
+        """
+        Returns a (texts x num_perm) signature matrix.
+
+        Texts are hashed a chunk at a time: the shingles of a whole chunk go
+        through the hash functions in one array operation and are reduced per
+        text with minimum.reduceat.
+        """
+        rows = []
+        for start in range(0, len(texts), chunk_size):
+            shingles = [self.shingles(text) for text in texts[start:start + chunk_size]]
+            offsets = np.cumsum([0] + [len(hashes) for hashes in shingles[:-1]])
+            values = (self._a * np.concatenate(shingles) + self._b) >> np.uint64(32)
+            rows.append(np.minimum.reduceat(values, offsets, axis=1).T)
+        return np.vstack(rows)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_duplicates(texts, threshold=DEFAULT_THRESHOLD, num_perm=64, bands=16, shingle_size=5):
+    """
+    Groups near-identical texts with MinHash and locality-sensitive hashing.
+
+    Signatures are cut into `bands` bands; texts sharing a band land in the
+    same bucket and become candidates, so the work grows with the number of
+    texts instead of the number of pairs. Each candidate is checked against
+    its bucket's first member, and pairs whose estimated Jaccard similarity
+    reaches `threshold` are merged with union-find.
+
+    Args:
+        texts: Description texts.
+        threshold: Minimum estimated Jaccard similarity of duplicates (0-1).
+        num_perm: Signature length; must be divisible by `bands`.
+        bands: Number of LSH bands. More bands catch less similar pairs.
+        shingle_size: Words per shingle.
+
+    Returns:
+        list: For each text, the index of its cluster's representative (the
+            first text of the cluster in input order).
+    """
+    if len(texts) < 2:
+        return list(range(len(texts)))
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm, shingle_size)
+    with timer("dedupe"):
+        signatures = hasher.signatures(texts)
+        parent = list(range(len(texts)))
+        for band in range(bands):
+            buckets = defaultdict(list)
+            band_values = signatures[:, band * rows:(band + 1) * rows]
+            for i in range(len(texts)):
+                buckets[band_values[i].tobytes()].append(i)
+            for members in buckets.values():
+                anchor = members[0]
+                for other in members[1:]:
+                    root_anchor, root_other = _find(parent, anchor), _find(parent, other)
+                    if root_anchor != root_other and \
+                            np.mean(signatures[anchor] == signatures[other]) >= threshold:
+                        parent[max(root_anchor, root_other)] = min(root_anchor, root_other)
+        representatives = [_find(parent, i) for i in range(len(texts))]
+    incr("duplicate_descriptions", len(texts) - len(set(representatives)))
+    return representatives
+
+
+def deduplicate(descriptions, threshold=DEFAULT_THRESHOLD):
+    """
+    Picks one representative description per cluster of near-duplicates.
+
+    Args:
+        descriptions: Description texts.
+        threshold: Minimum estimated Jaccard similarity of duplicates; 0 or None disables.
+
+    Returns:
+        tuple: (unique, cluster_of) where `unique` lists the representative
+            descriptions and `cluster_of[i]` is the position in `unique` of
+            description i's representative, so per-representative scores
+            expand back with `[scores[c] for c in cluster_of]`.
+    """
+    if not threshold:
+        return list(descriptions), list(range(len(descriptions)))
+    representatives = cluster_duplicates(descriptions, threshold)
+    position = {}
+    unique = []
+    for i, representative in enumerate(representatives):
+        if representative not in position:
+            position[representative] = len(unique)
+            unique.append(descriptions[representative])
+    if len(unique) < len(descriptions):
+        print(f"Deduplicated {len(descriptions)} descriptions into {len(unique)} clusters")
+    return unique, [position[representative] for representative in representatives]
+
+
+def mark_duplicates(jobs, cluster_of, label_field, field="duplicate_of"):
+    """
+    Labels the jobs whose description was scored as a near-duplicate of another's.
+
+    The first job of each cluster is its representative and gets an empty
+    `field`; every other member gets the representative's `label_field`, so
+    the ranked outputs show which rows are reposts of the same posting.
+
+    Args:
+        jobs: Job dicts, in the order their descriptions were scored.
+        cluster_of: Cluster position of each description, as returned by deduplicate.
+        label_field: Job field identifying the representative, e.g. its url.
+        field: Job field the label is stored in.
+    """
+    representatives = {}
+    for job, cluster in zip(jobs, cluster_of):
+        representative = representatives.setdefault(cluster, job)
+        job[field] = "" if representative is job else representative.get(label_field, "")
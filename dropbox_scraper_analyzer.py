@@ -2,20 +2,27 @@ import csv
 import os
 import re
 import asyncio
+import argparse
+import html
 from datetime import datetime
-from bs4 import BeautifulSoup
-from pyppeteer import launch
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-from nltk.tokenize import word_tokenize
-
-# Ensure required NLTK resources are available
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt", quiet=True)
-nltk.download('punkt_tab', quiet=True)
+
+from browser_pool import BrowserPool, ResourceBlocker
+from concurrent_fetch import HostRateLimiter, gather_bounded
+from dedupe import DEFAULT_THRESHOLD, mark_duplicates
+from html_parsing import extract_dropbox_description, extract_dropbox_listings, html_to_text
+from http_client import HttpClient
+from job_cache import add_cache_arguments, open_cache
+from listing_snapshot import ListingSnapshot, write_new_since_last_run
+from metrics import add_metrics_arguments, incr, timer, write_run_metrics
+from parallel_scoring import ScoringPool, add_workers_argument
+from posting_history import PostingHistory, add_history_argument, resume_name
+from resume_index import ResumeIndex, load_resumes
+from batch_report import write_batch_results
+from text_processing import print_stem_cache_stats
 
 OUTPUT_FOLDER = "dropbox_output"
+JOBS_API_URL = "https://boards-api.greenhouse.io/v1/boards/dropbox/jobs?content=true"
+LISTING_COUNT_JS = "document.querySelectorAll('li.open-positions__listing').length"
 
 # Ensure output folder exists and clean old files
 def setup_output_folder():
@@ -38,119 +45,265 @@ def filter_us_jobs(jobs):
             us_jobs.append(job)
     return us_jobs
 
-async def fetch_jobs():
-    """Fetches job postings from Dropbox's careers page using Pyppeteer."""
-    browser = await launch(headless=True, args=["--no-sandbox"])
-    page = await browser.newPage()
-    await page.goto("https://jobs.dropbox.com/all-jobs?", timeout=90000)
+async def fetch_jobs_api(client, url=JOBS_API_URL):
+    """
+    Fetches job postings and their descriptions from the Greenhouse board API behind jobs.dropbox.com.
 
-    # Scroll and wait for content to load fully
-    for _ in range(5):
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await asyncio.sleep(3)
+    Args:
+        url: Board API URL, with descriptions requested (`content=true`)
 
+    Returns:
+        list: US-based job dicts including a `description`, or None if the API is unavailable.
+    """
+    loop = asyncio.get_event_loop()
     try:
-        await page.waitForSelector(".open-positions__listing", timeout=60000)
-    except Exception:
-        print("Job listings did not load properly. Retrying...")
-        await asyncio.sleep(5)
-        await page.reload()
-        await asyncio.sleep(5)
-
-    content = await page.content()
-    soup = BeautifulSoup(content, 'html.parser')
-    listing_elements = soup.select('li.open-positions__listing')
-    print(f"Found {len(listing_elements)} listing elements with BeautifulSoup")
+        response = await loop.run_in_executor(None, client.get, url)
+        response.raise_for_status()
+        api_jobs = response.json()["jobs"]
+    except Exception as e:
+        incr("fetch_errors")
+        print(f"Job board API unavailable, falling back to the browser: {e}")
+        return None
 
     job_listings = []
-    for listing in listing_elements:
+    for api_job in api_jobs:
+        location = (api_job.get("location") or {}).get("name", "").strip()
+        job_listings.append({'title': api_job.get("title", "").strip(), 'location': location,
+                             'link': api_job.get("absolute_url", ""), 'content': api_job.get("content")})
+    print(f"Found {len(job_listings)} job listings through the API")
+    incr("listing_pages")
+    incr("jobs_listed", len(job_listings))
+    us_jobs = filter_us_jobs(job_listings)
+    # Descriptions are only extracted for the US jobs; the raw API content of the others is dropped here
+    for job in us_jobs:
+        with timer("description_extract"):
+            job['description'] = html_to_text(html.unescape(job.pop('content') or ""))
+    print(f"US-based jobs found: {len(us_jobs)}")
+    return us_jobs
+
+async def load_all_listings(page):
+    """Scrolls until no more listings are appended, waiting on the DOM instead of fixed sleeps."""
+    count = await page.evaluate(LISTING_COUNT_JS)
+    while True:
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
         try:
-            location = listing.get('data-location', '').strip()
-            link_element = listing.select_one('a.open-positions__listing-link')
-            if link_element:
-                link = link_element.get('href', '').strip()
-                if not link.startswith('http'):
-                    link = 'https://jobs.dropbox.com' + link
-                title_element = link_element.select_one('.open-positions__listing-title')
-                title = title_element.text.strip() if title_element else ''
-                job_listings.append({'title': title, 'location': location, 'link': link})
-                print(f"Extracted job: {title} | {location}")
-        except Exception as e:
-            print(f"Error parsing job listing: {e}")
-
-    await browser.close()
+            await page.waitForFunction(f"{LISTING_COUNT_JS} > {count}", timeout=3000)
+        except Exception:
+            return
+        count = await page.evaluate(LISTING_COUNT_JS)
+
+async def fetch_jobs(pool, client=None):
+    """
+    Fetches job postings from Dropbox's careers page.
+
+    The Greenhouse API is used when `client` is given; the page is rendered
+    with Pyppeteer only if that fails.
+    """
+    if client:
+        us_jobs = await fetch_jobs_api(client)
+        if us_jobs is not None:
+            return us_jobs
+
+    async with pool.page() as page:
+        with timer("navigation"):
+            await page.goto("https://jobs.dropbox.com/all-jobs?", timeout=90000)
+
+        try:
+            with timer("wait_for_selector"):
+                await page.waitForSelector(".open-positions__listing", timeout=60000)
+        except Exception:
+            print("Job listings did not load properly. Retrying...")
+            incr("fetch_errors")
+            await page.reload()
+            with timer("wait_for_selector"):
+                await page.waitForSelector(".open-positions__listing", timeout=60000)
+
+        # Scroll until the lazy-loaded list stops growing
+        with timer("scroll_listings"):
+            await load_all_listings(page)
+        content = await page.content()
+    incr("browser_html_bytes", len(content))
+    job_listings = extract_dropbox_listings(content)
+    print(f"Found {len(job_listings)} listing elements")
+    incr("listing_pages")
+    incr("jobs_listed", len(job_listings))
+    for listing in job_listings:
+        print(f"Extracted job: {listing['title']} | {listing['location']}")
+
     us_jobs = filter_us_jobs(job_listings)
     print(f"US-based jobs found: {len(us_jobs)}")
     return us_jobs
 
-async def scrape_job_details(job):
-    """Scrapes job details from individual job pages using Pyppeteer."""
-    job_file = os.path.join(OUTPUT_FOLDER, f"{re.sub(r'[^a-zA-Z0-9]', '_', job['title'])}.txt")
+def job_key(job):
+    """Returns the Greenhouse id at the end of the job link, or the link itself."""
+    match = re.search(r"(\d+)/?(?:\?.*)?$", job["link"])
+    return match.group(1) if match else job["link"]
+
+async def scrape_job_details(job, pool, cache=None, limiter=None):
+    """
+    Scrapes job details from individual job pages using Pyppeteer.
+    Jobs listed through the API already carry their description and skip the browser.
+    """
+    key = job_key(job)
+    job_file = os.path.join(OUTPUT_FOLDER, f"{re.sub(r'[^a-zA-Z0-9]', '_', job['title'])}_{re.sub(r'[^a-zA-Z0-9]', '_', key)[-40:]}.txt")
     
-    if os.path.exists(job_file):
-        with open(job_file, "r", encoding="utf-8") as f:
-            return {"title": job['title'], "description": f.read()}
+    if cache and not job.get("description"):
+        description = cache.get("dropbox", key)
+        if description is not None:
+            return {"title": job['title'], "description": description}
     
     try:
-        browser = await launch(headless=True, args=["--no-sandbox"])
-        page = await browser.newPage()
-        await page.goto(job["link"], timeout=90000)
-
-        for _ in range(5):
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(3)
-
-        await page.waitForSelector(".job-description-details, .jc03-content", timeout=60000)
-        content = await page.content()
-        soup = BeautifulSoup(content, 'html.parser')
-        description_element = soup.select_one(".job-description-details") or soup.select_one(".jc03-content")
-        description = description_element.get_text(" ").strip() if description_element else ""
+        description = job.get("description")
+        if not description:
+            if limiter:
+                await limiter.wait(job["link"])
+            async with pool.page() as page:
+                with timer("navigation"):
+                    await page.goto(job["link"], timeout=90000)
+                with timer("wait_for_selector"):
+                    await page.waitForSelector(".job-description-details, .jc03-content", timeout=60000)
+                content = await page.content()
+            incr("browser_html_bytes", len(content))
+            description = extract_dropbox_description(content)
+            if description:
+                incr("descriptions_fetched")
 
         with open(job_file, "w", encoding="utf-8") as f:
             f.write(description)
+        if cache and description:
+            cache.put("dropbox", key, description, url=job["link"], title=job["title"])
 
-        await browser.close()
         return {"title": job["title"], "description": description}
     
     except Exception as e:
+        incr("fetch_errors")
         print(f"Error fetching job details for {job['title']}: {e}")
         return None
 
 async def main():
+    parser = argparse.ArgumentParser(description="Scrape Dropbox jobs and match them against a resume.")
+    parser.add_argument("-r", "--resume", default="resume.txt", help="Path to the resume file")
+    parser.add_argument("--resumes", help="Directory of resumes or manifest file; scores every resume in one run")
+    parser.add_argument("--concurrency", type=int, default=5, help="Number of job pages fetched in parallel")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum requests per second per host (0 disables)")
+    add_cache_arguments(parser)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch and score postings that are new or changed since the last run")
+    parser.add_argument("--no-block-resources", action="store_true",
+                        help="Let the browser load images, fonts, media, stylesheets and trackers")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="Always scrape the careers site in the browser instead of the job board API")
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Score near-duplicate descriptions (MinHash similarity at least this) once (0 disables)")
+    add_workers_argument(parser)
+    add_metrics_arguments(parser)
+    add_history_argument(parser)
+    args = parser.parse_args()
+
     setup_output_folder()
+    cache = open_cache(args)
+    client = None if args.browser_only else HttpClient()
+    try:
+        blocker = None if args.no_block_resources else ResourceBlocker()
+        async with BrowserPool(max_tabs=args.concurrency, recycle_after=50, blocker=blocker,
+                               headless=True, args=["--no-sandbox"]) as pool:
+            await run(pool, args.concurrency, HostRateLimiter(rate=args.rate), cache, args.incremental,
+                      args.resume, args.resumes, client, args.history, args.dedupe_threshold, args.workers)
+    finally:
+        if client:
+            client.close()
+        if cache:
+            print(f"Description cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+        write_run_metrics(args, "dropbox")
+
+async def run(pool, concurrency=5, limiter=None, cache=None, incremental=False, resume_file="resume.txt",
+              resumes_path=None, client=None, history_path=None, dedupe_threshold=None, workers=0):
     print("Fetching Dropbox job listings...")
-    jobs = await fetch_jobs()
+    jobs = await fetch_jobs(pool, client)
     print(f"Total jobs found: {len(jobs)}")
     
     if not jobs:
         print("No jobs found. Exiting.")
         return
+    for job in jobs:
+        job["key"] = job_key(job)
     
     timestamp = datetime.now().strftime("%d%m%Y")
     output_file = f"dropbox_matched_jobs_{timestamp}.csv"
     
-    with open("resume.txt", "r", encoding="utf-8") as f:
-        resume_text = f.read()
+    # Keyed on the Greenhouse job id: the API lists absolute_url while the browser fallback lists the
+    # careers-page link, and a run that switched paths would otherwise report every posting as new
+    snapshot = ListingSnapshot("dropbox", "key", ["title", "location"], stored_fields=["link"])
+    all_jobs = jobs
+    if incremental:
+        diff = snapshot.diff(all_jobs)
+        jobs = diff.added + diff.changed
+        print(f"Incremental run: {len(jobs)} new or changed jobs, {len(diff.unchanged)} unchanged")
 
-    matched_jobs = []
-    for job in jobs:
+    async def fetch_details(job):
         print(f"Scraping details for: {job['title']}")
-        job_details = await scrape_job_details(job)
-        if job_details:
-            match_score = len(set(job_details["description"].lower().split()) & set(resume_text.lower().split())) / max(len(set(resume_text.lower().split())), 1) * 100
-            matched_jobs.append({
-                "title": job_details["title"],
-                "location": job["location"],
-                "link": job["link"],
-                "match_score": round(match_score, 2)
-            })
-    
+        return await scrape_job_details(job, pool, cache, limiter)
+
+    details = await gather_bounded(jobs, fetch_details, concurrency=concurrency)
+    fetched = [(job, job_details) for job, job_details in zip(jobs, details) if job_details]
+    descriptions = [job_details["description"] for _, job_details in fetched]
+    # The snapshot is saved only once the results are written, so a run that fails while
+    # scoring sees the same postings again. Postings without details are left out to be retried
+    processed = (diff.unchanged if incremental else []) + [job for job, _ in fetched]
+
+    if resumes_path:
+        resumes = load_resumes(resumes_path)
+        if fetched:
+            with ScoringPool(list(resumes.values()), workers) as scoring:
+                scores, cluster_of = await scoring.score_matrix(descriptions, dedupe_threshold, return_clusters=True)
+            mark_duplicates([job for job, _ in fetched], cluster_of, "link")
+            write_batch_results(".", "dropbox", list(resumes), [job for job, _ in fetched], scores,
+                                ["title", "location", "link", "duplicate_of"], "link", timestamp)
+        if history_path:
+            with PostingHistory(history_path) as history:
+                history.record("dropbox", all_jobs)
+                if fetched:
+                    history.record_scores("dropbox", [job for job, _ in fetched], list(resumes), scores)
+        if incremental:
+            write_new_since_last_run(f"dropbox_new_since_last_run_{timestamp}.csv", diff,
+                                     ["title", "location", "link"])
+        snapshot.save(processed)
+        return
+
+    with open(resume_file, "r", encoding="utf-8") as f:
+        resume_text = f.read()
+    with ScoringPool([ResumeIndex.from_text(resume_text)], workers) as scoring:
+        scores, cluster_of = await scoring.score_matrix(descriptions, dedupe_threshold, return_clusters=True)
+    mark_duplicates([job for job, _ in fetched], cluster_of, "link")
+    matched_jobs = []
+    for (job, job_details), match_score in zip(fetched, scores[0].tolist()):
+        job["match_score"] = round(match_score, 2)
+        matched_jobs.append({
+            "title": job_details["title"],
+            "location": job["location"],
+            "link": job["link"],
+            "match_score": round(match_score, 2),
+            "duplicate_of": job["duplicate_of"]
+        })
+    print_stem_cache_stats()
+    if history_path:
+        with PostingHistory(history_path) as history:
+            history.record("dropbox", all_jobs, resume_name(resume_file))
+
+    if incremental:
+        write_new_since_last_run(f"dropbox_new_since_last_run_{timestamp}.csv", diff,
+                                 ["title", "location", "link", "match_score", "duplicate_of"])
+        snapshot.save(processed)
+        return
+
     with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["title", "location", "link", "match_score"])
+        writer = csv.DictWriter(f, fieldnames=["title", "location", "link", "match_score", "duplicate_of"])
         writer.writeheader()
         writer.writerows(matched_jobs)
     
     print(f"Scraped details for {len(matched_jobs)} jobs. Results saved to {output_file}.")
+    snapshot.save(processed)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from metrics import timer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+ADOBE_ROLE_LINK = 'a[data-ph-id*="ph-page-element-page15-iK3vh8"]'
+ADOBE_LOCATION = 'span[data-ph-id*="ph-page-element-page15-4l6vaX"] span.job-location'
+DROPBOX_DESCRIPTION_CLASSES = ["job-description-details", "jc03-content"]
+
+
+def has_class(*names):
+    """
+    Builds a class matcher for SoupStrainer that works on multi-class elements.
+
+    While parsing, the strainer sees the raw class attribute ("job__description body"),
+    so matching is done on its whitespace-separated parts.
+    """
+    wanted = frozenset(names)
+    return lambda value: value is not None and not wanted.isdisjoint(value.split())
+
+
+@timer("html_parse")
+def parse(html, parse_only=None):
+    """
+    Parses HTML with the fastest available backend.
+
+    Args:
+        html: Page HTML as str or bytes.
+        parse_only: Optional SoupStrainer; only matching subtrees are built.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    return BeautifulSoup(html, PARSER, parse_only=parse_only)
+
+
+def html_to_text(html, separator=" "):
+    """Returns the visible text of an HTML fragment."""
+    return parse(html).get_text(separator).strip()
+
+
+@timer("listing_extract")
+def extract_adobe_listings(html) -> List[Dict[str, Optional[str]]]:
+    """
+    Extracts job listings from an Adobe search results page.
+
+    Only the `li.jobs-list-item` subtrees are parsed.
+
+    Returns:
+        list: Dicts with role, role_url, req_id and location (None when missing).
+    """
+    soup = parse(html, SoupStrainer("li", class_=has_class("jobs-list-item")))
+    listings = []
+    for job in soup.select("li.jobs-list-item"):
+        try:
+            role_elem = job.select_one(ADOBE_ROLE_LINK)
+            title_elem = role_elem.select_one("div.job-title") if role_elem else None
+            location_elem = job.select_one(ADOBE_LOCATION)
+            listings.append({
+                "role": title_elem.text.strip() if title_elem else None,
+                "role_url": role_elem.get("href") if role_elem else None,
+                "req_id": role_elem.get("data-ph-at-job-id-text") if role_elem else None,
+                # Trim "Location" and extra whitespace
+                "location": location_elem.text.replace("Location", "").strip() if location_elem else None,
+            })
+        except Exception as e:
+            print(f"Error processing job data: {e}")
+    return listings
+
+
+@timer("listing_extract")
+def extract_dropbox_listings(html) -> List[Dict[str, str]]:
+    """
+    Extracts job listings from the Dropbox all-jobs page.
+
+    Only the `li.open-positions__listing` subtrees are parsed.
+
+    Returns:
+        list: Dicts with title, location and an absolute link.
+    """
+    soup = parse(html, SoupStrainer("li", class_=has_class("open-positions__listing")))
+    listings = []
+    for listing in soup.select("li.open-positions__listing"):
+        try:
+            link_element = listing.select_one("a.open-positions__listing-link")
+            if link_element:
+                link = link_element.get("href", "").strip()
+                if not link.startswith("http"):
+                    link = "https://jobs.dropbox.com" + link
+                title_element = link_element.select_one(".open-positions__listing-title")
+                listings.append({
+                    "title": title_element.text.strip() if title_element else "",
+                    "location": listing.get("data-location", "").strip(),
+                    "link": link,
+                })
+        except Exception as e:
+            print(f"Error parsing job listing: {e}")
+    return listings
+
+
+@timer("description_extract")
+def extract_dropbox_description(html) -> str:
+    """Extracts the description text from a Dropbox job page ("" when not found)."""
+    soup = parse(html, SoupStrainer(class_=has_class(*DROPBOX_DESCRIPTION_CLASSES)))
+    element = soup.select_one(".job-description-details") or soup.select_one(".jc03-content")
+    return element.get_text(" ").strip() if element else ""
+
+
+@timer("description_extract")
+def extract_greenhouse_description(html) -> Optional[str]:
+    """Extracts the description text from a Greenhouse job page, or None when not found."""
+    soup = parse(html, SoupStrainer("div", class_=has_class("job__description")))
+    element = soup.find("div", class_="job__description")
+    return element.get_text(separator="\n", strip=True) if element else None
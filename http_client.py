@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import incr, timer
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+class HttpClient:
+    """
+    Connection-pooled HTTP client with retries and conditional GETs.
+
+    Every request goes through one requests.Session so connections are kept
+    alive between calls. Failed requests and 429/5xx responses are retried with
+    exponential backoff (honouring Retry-After). When `cache_dir` is set, the
+    ETag/Last-Modified of each 200 response is stored with its body, and the
+    next GET of that url is sent as a conditional request; a 304 answer is
+    served from the stored body. Callers pass `conditional=False` for pages
+    cached elsewhere (job descriptions live in JobCache), and `evict()` (run
+    on close) removes the least recently used entries beyond `cache_max_bytes`.
+    """
+
+    def __init__(self, cache_dir=None, timeout=30, retries=5, backoff=0.5, pool_size=10,
+                 cache_max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset(["GET", "HEAD"]), respect_retry_after_header=True,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json"), os.path.join(self.cache_dir, key + ".body")
+
+    def _load_cached(self, url):
+        meta_path, body_path = self._cache_paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+            # Marks the entry as recently used for evict()
+            os.utime(meta_path)
+            return meta, body
+        except (OSError, ValueError):
+            return None, None
+
+    def _store(self, url, response):
+        validators = {k: response.headers[k] for k in ("ETag", "Last-Modified") if k in response.headers}
+        if not validators:
+            return
+        meta = {"url": url, "validators": validators,
+                "content_type": response.headers.get("Content-Type", ""), "encoding": response.encoding}
+        meta_path, body_path = self._cache_paths(url)
+        with self._lock:
+            with open(body_path, "wb") as f:
+                f.write(response.content)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    @staticmethod
+    def _from_cache(url, meta, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.encoding = meta.get("encoding")
+        response.headers["Content-Type"] = meta.get("content_type", "")
+        response.headers.update(meta["validators"])
+        response.from_cache = True
+        return response
+
+    def evict(self):
+        """
+        Removes the least recently used cache entries until they fit in `cache_max_bytes`.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if not self.cache_dir or not self.cache_max_bytes:
+            return 0
+        entries = []
+        total = 0
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                meta_path = os.path.join(self.cache_dir, name)
+                body_path = meta_path[:-len(".json")] + ".body"
+                try:
+                    size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                    entries.append((os.path.getmtime(meta_path), size, meta_path, body_path))
+                except OSError:
+                    continue
+                total += size
+            removed = 0
+            for _, size, meta_path, body_path in sorted(entries):
+                if total <= self.cache_max_bytes:
+                    break
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                removed += 1
+        return removed
+
+    def get(self, url, conditional=True, **kwargs):
+        """
+        Sends a GET request, revalidating against the stored copy when one exists.
+
+        Args:
+            url: Url to fetch.
+            conditional: Whether to use and update the ETag/Last-Modified store
+                for this url; False for pages cached elsewhere.
+            **kwargs: Extra arguments passed to requests.Session.get.
+
+        Returns:
+            requests.Response: The response; `from_cache` is True when it was a 304.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        use_cache = self.cache_dir and conditional
+        meta, body = self._load_cached(url) if use_cache else (None, None)
+        if meta:
+            headers = dict(kwargs.pop("headers", None) or {})
+            if "ETag" in meta["validators"]:
+                headers["If-None-Match"] = meta["validators"]["ETag"]
+            if "Last-Modified" in meta["validators"]:
+                headers["If-Modified-Since"] = meta["validators"]["Last-Modified"]
+            kwargs["headers"] = headers
+
+        with timer("http_request"):
+            response = self.session.get(url, **kwargs)
+        incr("http_requests")
+        if response.status_code == 304 and meta:
+            incr("http_not_modified")
+            return self._from_cache(url, meta, body)
+        if response.status_code >= 400:
+            incr("http_errors")
+        incr("bytes_downloaded", len(response.content))
+        response.from_cache = False
+        if use_cache and response.status_code == 200:
+            self._store(url, response)
+        return response
+
+    def close(self):
+        self.evict()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
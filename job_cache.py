@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import incr
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "job_cache.sqlite")
+DEFAULT_TTL_DAYS = 7
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class JobCache:
+    """
+    On-disk cache of fetched job descriptions shared by all scrapers.
+
+    Entries are keyed by company and job id (req id, Greenhouse id or url), so
+    two postings with the same title never overwrite each other. Entries older
+    than `ttl_days` are treated as missing (0 misses every entry, None never
+    expires), and `evict()` drops expired rows and then the oldest rows until
+    the stored text fits in `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=DEFAULT_TTL_DAYS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days is not None else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS descriptions (
+                   company TEXT NOT NULL,
+                   job_key TEXT NOT NULL,
+                   url TEXT,
+                   title TEXT,
+                   description TEXT NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   size INTEGER NOT NULL,
+                   PRIMARY KEY (company, job_key))""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_descriptions_fetched_at ON descriptions (fetched_at)")
+        self._conn.commit()
+
+    def get(self, company, job_key):
+        """
+        Returns the cached description, or None when missing or expired.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, fetched_at FROM descriptions WHERE company = ? AND job_key = ?",
+                (company, str(job_key))).fetchone()
+        if row and (self.ttl is None or time.time() - row[1] <= self.ttl):
+            self.hits += 1
+            incr("cache_hits")
+            return row[0]
+        self.misses += 1
+        incr("cache_misses")
+        return None
+
+    def peek(self, company, job_key):
+        """
+        Returns the stored description whatever its age, without counting a hit or miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description FROM descriptions WHERE company = ? AND job_key = ?",
+                (company, str(job_key))).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, company, job_key):
+        """
+        Returns whether `get` would return a description, without counting a hit or miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at FROM descriptions WHERE company = ? AND job_key = ?",
+                (company, str(job_key))).fetchone()
+        return bool(row) and (self.ttl is None or time.time() - row[0] <= self.ttl)
+
+    def put(self, company, job_key, description, url="", title=""):
+        """Stores a freshly fetched description."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (company, str(job_key), url, title, description, time.time(), len(description.encode("utf-8"))))
+            self._conn.commit()
+
+    def evict(self):
+        """
+        Removes expired entries, then the oldest ones until under `max_bytes`.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        removed = 0
+        with self._lock:
+            # With a TTL of 0 this run refetched everything; its fresh entries stay for later runs
+            if self.ttl:
+                removed += self._conn.execute("DELETE FROM descriptions WHERE fetched_at < ?",
+                                              (time.time() - self.ttl,)).rowcount
+            if self.max_bytes:
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM descriptions").fetchone()[0]
+                rows = self._conn.execute(
+                    "SELECT company, job_key, size FROM descriptions ORDER BY fetched_at").fetchall()
+                for company, job_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM descriptions WHERE company = ? AND job_key = ?",
+                                       (company, job_key))
+                    total -= size
+                    removed += 1
+            self._conn.commit()
+        return removed
+
+    def close(self):
+        self.evict()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def add_cache_arguments(parser):
+    """Adds the description cache options shared by every scraper."""
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Job description cache file (empty string disables)")
+    parser.add_argument("--cache-ttl-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help="Refetch cached descriptions older than this (0 refetches everything)")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Evict the oldest cached descriptions beyond this size at the end of the run (0 disables)")
+
+
+def cache_options(args):
+    """Returns the JobCache keyword arguments selected by add_cache_arguments' options."""
+    return {"ttl_days": args.cache_ttl_days, "max_bytes": int(args.cache_max_mb * 1024 * 1024)}
+
+
+def open_cache(args):
+    """Opens the JobCache selected on the command line, or returns None when disabled."""
+    return JobCache(args.cache, **cache_options(args)) if args.cache else None
@@ -0,0 +1,207 @@
+import csv
+import json
+import sys
+
+from job_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, JobCache
+
+RECORD_FIELDS = ["board", "key", "title", "url", "location", "department", "first_published", "updated_at",
+                 "match_score", "duplicate_of"]
+# Names the boards use for the normalized record fields
+FIELD_ALIASES = {
+    "key": ("key", "req_id", "job_id", "link"),
+    "title": ("title", "role"),
+    "url": ("url", "role_url", "link"),
+    "match_score": ("match_score", "fit_score"),
+}
+PARQUET_BATCH_ROWS = 50000
+
+
+def _intern(value):
+    return sys.intern(value) if value else ""
+
+
+def _score(value):
+    """Parses scores stored as numbers or as "12.34%" strings."""
+    if isinstance(value, str):
+        return float(value.rstrip("%")) if value.strip() else None
+    return value
+
+
+def _field(job, name, default=None):
+    for alias in FIELD_ALIASES.get(name, (name,)):
+        value = job.get(alias)
+        if value is not None and value != "":
+            return value
+    return default
+
+
+class JobRecord:
+    """
+    Compact record of one posting.
+
+    Uses __slots__ instead of a per-job dict, and interns the board, location
+    and department strings, which repeat across thousands of postings. The
+    description is not held: `description` reads it from the record's
+    JobStore on access.
+    """
+
+    __slots__ = ("board", "key", "title", "url", "location", "department", "first_published", "updated_at",
+                 "match_score", "duplicate_of", "_store")
+
+    def __init__(self, board, key, title, url="", location="", department="", first_published=None,
+                 updated_at=None, match_score=None, store=None, duplicate_of=""):
+        self.board = _intern(board)
+        self.key = str(key)
+        self.title = title
+        self.url = url
+        self.location = _intern(location)
+        self.department = _intern(department)
+        self.first_published = first_published
+        self.updated_at = updated_at
+        self.match_score = match_score
+        self.duplicate_of = duplicate_of
+        self._store = store
+
+    @classmethod
+    def from_job(cls, board, job, store=None):
+        """Builds a record from a board's job dict, whatever names the board uses for its fields."""
+        return cls(board, _field(job, "key"), _field(job, "title", ""), _field(job, "url", ""),
+                   job.get("location") or "", job.get("department") or "", job.get("first_published"),
+                   job.get("updated_at"), _score(_field(job, "match_score")), store, job.get("duplicate_of") or "")
+
+    @property
+    def description(self):
+        return self._store.description(self) if self._store else None
+
+    def get(self, field, default=None):
+        """Dict-style access, so records can be passed where job dicts are expected."""
+        return getattr(self, field, default) if field in RECORD_FIELDS or field == "description" else default
+
+    def as_dict(self, fields=RECORD_FIELDS):
+        return {field: getattr(self, field) for field in fields}
+
+    def __repr__(self):
+        return f"JobRecord({self.board!r}, {self.key!r}, {self.title!r})"
+
+
+class JobStore:
+    """
+    Memory-lean collection of JobRecords.
+
+    Descriptions stay on disk in the JobCache at `cache_path`, keyed by board
+    and record key like the scrapers' own cache entries, and are only read
+    back on access or export. Without a cache path they are kept in memory.
+    `ttl_days` and `max_bytes` are the cache's expiry and size cap, applied
+    when the store is closed.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, ttl_days=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.records = []
+        # Descriptions are read back with peek, whatever their age, so the TTL only
+        # decides which of them the cache keeps once the store is closed
+        self._cache = JobCache(cache_path, ttl_days, max_bytes) if cache_path else None
+        self._descriptions = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def add(self, board, job, description=None):
+        """
+        Adds a board's job dict as a JobRecord.
+
+        Args:
+            board: Board name, e.g. "adobe".
+            job: Job dict as produced by the board's scraper.
+            description: Optional description text to keep in the on-disk store.
+
+        Returns:
+            JobRecord: The new record.
+        """
+        record = JobRecord.from_job(board, job, self)
+        if description:
+            if self._cache is None:
+                self._descriptions[(record.board, record.key)] = description
+            elif self._cache.peek(record.board, record.key) != description:
+                self._cache.put(record.board, record.key, description, url=record.url, title=record.title)
+        self.records.append(record)
+        return record
+
+    def description(self, record):
+        if self._cache is None:
+            return self._descriptions.get((record.board, record.key))
+        return self._cache.peek(record.board, record.key)
+
+    def ranked(self):
+        """Returns the records with a score, best match first."""
+        return sorted((record for record in self.records if record.match_score is not None),
+                      key=lambda record: record.match_score, reverse=True)
+
+    def _rows(self, records, fields, descriptions):
+        for record in self.records if records is None else records:
+            row = record.as_dict(fields)
+            if descriptions:
+                row["description"] = record.description
+            yield row
+
+    def to_csv(self, path, fields=RECORD_FIELDS, records=None, descriptions=False):
+        """Writes the records (or the given subset, in its order) to a CSV file."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields + (["description"] if descriptions else []))
+            writer.writeheader()
+            writer.writerows(self._rows(records, fields, descriptions))
+
+    def to_jsonl(self, path, fields=RECORD_FIELDS, records=None, descriptions=False):
+        """Writes the records as one JSON object per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            for row in self._rows(records, fields, descriptions):
+                f.write(json.dumps(row) + "\n")
+
+    def to_parquet(self, path, fields=RECORD_FIELDS, records=None, descriptions=False):
+        """
+        Writes the records to a Parquet file in batches of PARQUET_BATCH_ROWS rows.
+
+        Requires pyarrow.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        columns = fields + (["description"] if descriptions else [])
+        schema = pa.schema([(name, pa.float64() if name == "match_score" else pa.string()) for name in columns])
+        with pq.ParquetWriter(path, schema) as writer:
+            batch = []
+            for row in self._rows(records, fields, descriptions):
+                batch.append(row)
+                if len(batch) >= PARQUET_BATCH_ROWS:
+                    writer.write_table(self._parquet_table(pa, schema, batch))
+                    batch = []
+            if batch:
+                writer.write_table(self._parquet_table(pa, schema, batch))
+
+    @staticmethod
+    def _parquet_table(pa, schema, rows):
+        arrays = {}
+        for name in schema.names:
+            if name == "match_score":
+                arrays[name] = [None if row[name] is None else float(row[name]) for row in rows]
+            else:
+                arrays[name] = [None if row[name] is None else str(row[name]) for row in rows]
+        return pa.Table.from_pydict(arrays, schema=schema)
+
+    def export(self, path, fields=RECORD_FIELDS, records=None, descriptions=False):
+        """Writes the records as Parquet, JSONL or CSV, chosen by the file extension."""
+        if path.endswith(".parquet"):
+            self.to_parquet(path, fields, records, descriptions)
+        elif path.endswith(".jsonl"):
+            self.to_jsonl(path, fields, records, descriptions)
+        else:
+            self.to_csv(path, fields, records, descriptions)
+
+    def close(self):
+        if self._cache:
+            self._cache.close()
@@ -0,0 +1,82 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton matching many keyword phrases in one pass.
+
+    Built once from the keyword list, it finds every keyword occurring as a
+    case-insensitive substring of a title in time linear in the title length,
+    independent of how many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(kw.strip().lower() for kw in keywords if kw.strip()))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(index)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path):
+        """Builds a matcher from a keywords file with one phrase per line."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f.readlines())
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text):
+        """
+        Finds every keyword occurrence in text.
+
+        Returns:
+            list: (keyword, start, end) tuples, `end` exclusive, in order of end position.
+        """
+        matches = []
+        node = 0
+        for position, char in enumerate(text.lower()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._out[node]:
+                keyword = self.keywords[index]
+                matches.append((keyword, position + 1 - len(keyword), position + 1))
+        return matches
+
+    def matches(self, text):
+        """Returns True as soon as any keyword is found in text."""
+        node = 0
+        for char in text.lower():
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._out[node]:
+                return True
+        return False
+
+    def longest_match(self, text):
+        """Returns the longest keyword found in text, or None."""
+        found = self.find_all(text)
+        return max((keyword for keyword, _, _ in found), key=len) if found else None
@@ -0,0 +1,90 @@
+import csv
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "snapshots")
+
+ListingDiff = namedtuple("ListingDiff", ["added", "removed", "changed", "unchanged"])
+
+
+class ListingSnapshot:
+    """
+    Stores the listings seen on a board so the next run can skip unchanged ones.
+
+    A listing is identified by `key` (a job dict field such as "req_id") and
+    compared on its `updated_at` value when the board provides one, otherwise
+    on a fingerprint of the `fields` it was listed with. `stored_fields` are
+    kept in the snapshot for the removed-postings report but not compared,
+    e.g. a link that differs between two ways of listing the same board.
+    """
+
+    def __init__(self, board, key, fields, directory=DEFAULT_SNAPSHOT_DIR, stored_fields=()):
+        self.board = board
+        self.key = key
+        self.fields = fields
+        self.stored_fields = list(stored_fields)
+        self.path = os.path.join(directory, f"{board}.json")
+
+    def _entry(self, job):
+        fingerprint = hashlib.sha1("\x1f".join(str(job.get(f, "")) for f in self.fields).encode("utf-8")).hexdigest()
+        return {"fingerprint": fingerprint, "updated_at": job.get("updated_at"),
+                **{f: job.get(f, "") for f in self.fields + self.stored_fields}}
+
+    def load(self):
+        """Returns the previous snapshot as a dict of key -> entry (empty on first run)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def diff(self, jobs):
+        """
+        Compares the current listings against the stored snapshot.
+
+        Args:
+            jobs: Current list of job dicts.
+
+        Returns:
+            ListingDiff: Added, changed and unchanged job dicts, and removed snapshot entries.
+        """
+        previous = self.load()
+        added, changed, unchanged = [], [], []
+        seen = set()
+        for job in jobs:
+            key = str(job[self.key])
+            seen.add(key)
+            old = previous.get(key)
+            if old is None:
+                added.append(job)
+            elif (old.get("updated_at"), old["fingerprint"]) != (job.get("updated_at"), self._entry(job)["fingerprint"]):
+                changed.append(job)
+            else:
+                unchanged.append(job)
+        removed = [dict(entry, **{self.key: key}) for key, entry in previous.items() if key not in seen]
+        return ListingDiff(added, removed, changed, unchanged)
+
+    def save(self, jobs):
+        """Replaces the stored snapshot with the current listings."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        snapshot = {str(job[self.key]): self._entry(job) for job in jobs}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+
+def write_new_since_last_run(path, diff, fieldnames):
+    """
+    Writes the "new since last run" report: added and changed postings, then removed ones.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["change"] + fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        for change, jobs in (("added", diff.added), ("changed", diff.changed), ("removed", diff.removed)):
+            for job in jobs:
+                writer.writerow({"change": change, **{k: job.get(k, "") for k in fieldnames}})
+    print(f"{len(diff.added)} new, {len(diff.changed)} changed, {len(diff.removed)} removed since last run. "
+          f"Report saved to {path}")
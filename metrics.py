@@ -0,0 +1,181 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_METRICS_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "metrics")
+
+
+class RunMetrics:
+    """
+    Stage timers and counters collected over one scraper run.
+
+    Timers keep the call count, total and maximum wall time of each stage
+    (navigation, wait_for_selector, html_parse, description_extract, stemming,
+    scoring, ...); counters track pages, jobs, fetch errors, cache hits and
+    bytes downloaded. Both are safe to update from threads and coroutines.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = Counter()
+        self.gauges = {}
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Times the enclosed block as one call of `stage`.
+
+        Also usable as a decorator on regular (non-async) functions.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                calls, total, slowest = self.timers.get(stage, (0, 0.0, 0.0))
+                self.timers[stage] = (calls + 1, total + elapsed, max(slowest, elapsed))
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def drain(self):
+        """
+        Returns the timers and counters collected so far and clears them.
+
+        Worker processes drain their metrics after each task and hand them to
+        the parent, which adds them to its own with `merge`.
+
+        Returns:
+            tuple: (timers, counters) dicts in the internal format.
+        """
+        with self._lock:
+            timers, counters = dict(self.timers), dict(self.counters)
+            self.timers.clear()
+            self.counters.clear()
+        return timers, counters
+
+    def merge(self, timers, counters):
+        """Adds timers and counters drained from another RunMetrics, e.g. a worker process's."""
+        with self._lock:
+            for stage, (calls, total, slowest) in timers.items():
+                own_calls, own_total, own_slowest = self.timers.get(stage, (0, 0.0, 0.0))
+                self.timers[stage] = (own_calls + calls, own_total + total, max(own_slowest, slowest))
+            self.counters.update(counters)
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.timers.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def snapshot(self):
+        """
+        Returns the metrics collected so far.
+
+        Returns:
+            dict: started_at, duration_seconds, timers (calls, total_seconds,
+                max_seconds per stage), counters and gauges.
+        """
+        with self._lock:
+            timers = {stage: {"calls": calls, "total_seconds": round(total, 6), "max_seconds": round(slowest, 6)}
+                      for stage, (calls, total, slowest) in sorted(self.timers.items())}
+            counters = dict(sorted(self.counters.items()))
+            gauges = dict(sorted(self.gauges.items()))
+        return {"started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "duration_seconds": round(time.time() - self.started, 3),
+                "timers": timers, "counters": counters, "gauges": gauges}
+
+    def write_json(self, path, **labels):
+        """Writes the snapshot, plus any labels such as board, to a JSON file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(labels, **self.snapshot()), f, indent=2)
+
+    def write_prometheus(self, path, prefix="job_scraper", **labels):
+        """
+        Writes the snapshot in the Prometheus text exposition format.
+
+        The file can be picked up by node_exporter's textfile collector or
+        pushed to a Pushgateway.
+        """
+        snapshot = self.snapshot()
+
+        def series(name, value, **extra):
+            label_text = ",".join(f'{key}="{val}"' for key, val in sorted(dict(labels, **extra).items()))
+            return f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}"
+
+        lines = [f"# TYPE {prefix}_run_duration_seconds gauge",
+                 series("run_duration_seconds", snapshot["duration_seconds"]),
+                 f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, stats in snapshot["timers"].items():
+            lines.append(series("stage_seconds_sum", stats["total_seconds"], stage=stage))
+            lines.append(series("stage_seconds_count", stats["calls"], stage=stage))
+        lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+        for stage, stats in snapshot["timers"].items():
+            lines.append(series("stage_max_seconds", stats["max_seconds"], stage=stage))
+        for name, value in snapshot["counters"].items():
+            metric = re.sub(r"[^a-zA-Z0-9_]", "_", name) + "_total"
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            lines.append(series(metric, value))
+        for name, value in snapshot["gauges"].items():
+            metric = re.sub(r"[^a-zA-Z0-9_]", "_", name)
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            lines.append(series(metric, value))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def summary(self):
+        """Returns a one-line human readable summary of the slowest stages."""
+        snapshot = self.snapshot()
+        stages = sorted(snapshot["timers"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        return "Stage times: " + ", ".join(f"{stage} {stats['total_seconds']:.2f}s/{stats['calls']}"
+                                           for stage, stats in stages[:6])
+
+
+METRICS = RunMetrics()
+timer = METRICS.timer
+incr = METRICS.incr
+set_gauge = METRICS.set_gauge
+
+
+def add_metrics_arguments(parser):
+    """Adds the --metrics and --prometheus options shared by every scraper."""
+    parser.add_argument("--metrics", default=DEFAULT_METRICS_DIR,
+                        help="Directory or .json file for the run metrics (empty string disables)")
+    parser.add_argument("--prometheus", metavar="PATH",
+                        help="Also write the run metrics in Prometheus text format to this file")
+
+
+def write_run_metrics(args, board):
+    """
+    Writes the metrics of this run as requested on the command line.
+
+    Returns:
+        str: Path of the JSON metrics file, or None when disabled.
+    """
+    print(METRICS.summary())
+    path = None
+    if args.metrics:
+        path = args.metrics
+        if not path.endswith(".json"):
+            path = os.path.join(path, f"{board}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        METRICS.write_json(path, board=board)
+        print(f"Run metrics saved to {path}")
+    if args.prometheus:
+        METRICS.write_prometheus(args.prometheus, board=board)
+    return path
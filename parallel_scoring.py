@@ -0,0 +1,184 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from dedupe import deduplicate
+from metrics import METRICS, incr, timer
+from resume_index import score_description
+from text_processing import stem, stem_tokens
+from tfidf_scoring import TfidfScorer
+
+# Process start-up and pickling outweigh the stemming saved on typical corpora of a few
+# thousand postings (see score_workers_<n> in benchmarks/run_benchmarks.py), so scoring
+# stays in the main process unless --workers is given
+DEFAULT_WORKERS = 0
+DEFAULT_CHUNK_SIZE = 100
+
+# Resume indexes of the current worker process, set once by _init_worker
+_worker_resumes = None
+
+
+def _init_worker(resume_indexes):
+    global _worker_resumes
+    _worker_resumes = resume_indexes
+    # A forked worker starts with a copy of the parent's metrics, which must not be reported back
+    METRICS.reset()
+
+
+def _run_in_worker(func, texts):
+    """
+    Runs func on a chunk in a worker and returns its results with the metrics it collected.
+
+    Returns:
+        tuple: (results, timers, counters); the stem cache lookups of the
+            chunk are counted as worker_stem_cache_hits/misses.
+    """
+    before = stem.cache_info()
+    results = func(texts)
+    after = stem.cache_info()
+    incr("worker_stem_cache_hits", after.hits - before.hits)
+    incr("worker_stem_cache_misses", after.misses - before.misses)
+    return (results,) + METRICS.drain()
+
+
+def _count_terms(texts):
+    """Stems a chunk of descriptions into term counts (runs in a worker)."""
+    return [Counter(stem_tokens(text)) for text in texts]
+
+
+def _overlap_scores(texts, resume_indexes=None):
+    """Scores a chunk of descriptions against every resume with score_description (runs in a worker)."""
+    resume_indexes = resume_indexes or _worker_resumes
+    return [[score_description(resume_index, text) for resume_index in resume_indexes] for text in texts]
+
+
+class ScoringPool:
+    """
+    Runs the CPU-bound tokenizing, stemming and scoring in worker processes.
+
+    Descriptions are sent to the workers in chunks of `chunk_size`, while the
+    resume indexes are shipped once per worker through the pool initializer.
+    TF-IDF weights depend on the whole corpus, so the workers only return
+    term counts and the (cheap) sparse matrix product runs in this process.
+
+    The async methods go through `run_in_executor`, so they do not block the
+    event loop; only the streaming runner has fetches in flight while it
+    scores, as the batch runners fetch every description first. The `_sync`
+    variants are for the thread-based scrapers. With `workers=0` everything
+    runs in this process (on a thread for the async methods).
+
+    The timers and counters each chunk collects in its worker (stemming, the
+    stem cache lookups) are merged into this process's METRICS.
+    """
+
+    def __init__(self, resume_indexes, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.resume_indexes = list(resume_indexes)
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(self.resume_indexes,)) if workers > 0 else None
+
+    def _chunks(self, texts):
+        return [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+
+    def _overlap_func(self):
+        return _overlap_scores if self._executor else partial(_overlap_scores, resume_indexes=self.resume_indexes)
+
+    @staticmethod
+    def _collect(results):
+        """Merges the metrics returned with each worker chunk and flattens the chunk results."""
+        items = []
+        for chunk, timers, counters in results:
+            METRICS.merge(timers, counters)
+            items.extend(chunk)
+        return items
+
+    async def _map(self, func, texts):
+        loop = asyncio.get_event_loop()
+        chunks = self._chunks(texts)
+        incr("scoring_chunks", len(chunks))
+        if not self._executor:
+            results = await asyncio.gather(*[loop.run_in_executor(None, func, chunk) for chunk in chunks])
+            return [item for chunk in results for item in chunk]
+        return self._collect(await asyncio.gather(
+            *[loop.run_in_executor(self._executor, _run_in_worker, func, chunk) for chunk in chunks]))
+
+    def _map_sync(self, func, texts):
+        chunks = self._chunks(texts)
+        incr("scoring_chunks", len(chunks))
+        if not self._executor:
+            return [item for chunk in map(func, chunks) for item in chunk]
+        return self._collect(self._executor.map(partial(_run_in_worker, func), chunks))
+
+    def _tfidf(self, unique, term_counts, cluster_of):
+        return TfidfScorer(unique, term_counts).score(self.resume_indexes)[:, cluster_of]
+
+    def _empty(self, return_clusters):
+        scores = np.zeros((len(self.resume_indexes), 0))
+        return (scores, []) if return_clusters else scores
+
+    async def score_matrix(self, descriptions, dedupe_threshold=None, return_clusters=False):
+        """
+        Scores every resume against the descriptions with TF-IDF cosine similarity.
+
+        Near-duplicate descriptions (see dedupe.py) are scored once with
+        TfidfScorer and every member of a cluster gets its representative's
+        score. Deduplication and the final matrix product run on the default
+        thread pool, so no stage blocks the event loop.
+
+        Returns:
+            numpy.ndarray: (resumes x descriptions) match percentages; with
+                `return_clusters`, a (scores, cluster_of) tuple (see dedupe.deduplicate).
+        """
+        if not descriptions:
+            return self._empty(return_clusters)
+        loop = asyncio.get_event_loop()
+        unique, cluster_of = await loop.run_in_executor(None, deduplicate, descriptions, dedupe_threshold)
+        with timer("parallel_stemming"):
+            term_counts = await self._map(_count_terms, unique)
+        scores = await loop.run_in_executor(None, self._tfidf, unique, term_counts, cluster_of)
+        return (scores, cluster_of) if return_clusters else scores
+
+    def score_matrix_sync(self, descriptions, dedupe_threshold=None, return_clusters=False):
+        if not descriptions:
+            return self._empty(return_clusters)
+        unique, cluster_of = deduplicate(descriptions, dedupe_threshold)
+        with timer("parallel_stemming"):
+            term_counts = self._map_sync(_count_terms, unique)
+        scores = self._tfidf(unique, term_counts, cluster_of)
+        return (scores, cluster_of) if return_clusters else scores
+
+    async def overlap_scores(self, descriptions):
+        """
+        Scores the descriptions with score_description against every resume.
+
+        Returns:
+            numpy.ndarray: (resumes x descriptions) percentages of each
+                description's terms found in the resume.
+        """
+        scores = await self._map(self._overlap_func(), descriptions)
+        return np.array(scores, dtype=np.float64).reshape(len(descriptions), len(self.resume_indexes)).T
+
+    def overlap_scores_sync(self, descriptions):
+        scores = self._map_sync(self._overlap_func(), descriptions)
+        return np.array(scores, dtype=np.float64).reshape(len(descriptions), len(self.resume_indexes)).T
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def add_workers_argument(parser):
+    """Adds the --workers option shared by every scraper."""
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Processes used to stem and score descriptions (default 0: score in the main process; "
+                             "worth it for large corpora on several cores)")
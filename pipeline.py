@@ -0,0 +1,141 @@
+import asyncio
+import csv
+import inspect
+import json
+import os
+
+_DONE = object()
+
+
+class CsvSink:
+    """
+    Appends scored jobs to a CSV file one row at a time.
+
+    Each row is flushed as soon as it is written, so an interrupted run keeps
+    everything scored so far. Keys of rows already in the file are loaded on
+    open, letting a rerun skip them via `seen`.
+    """
+
+    def __init__(self, path, fieldnames, key_field="key"):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.key_field = key_field
+        self.written = 0
+        self._keys = set()
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                self._keys = {row.get(key_field) for row in csv.DictReader(f)}
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+        if not exists:
+            self._writer.writeheader()
+
+    def seen(self, job):
+        return str(job.get(self.key_field)) in self._keys
+
+    def write(self, job):
+        self._writer.writerow(job)
+        self._file.flush()
+        self._keys.add(str(job.get(self.key_field)))
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink(CsvSink):
+    """Same as CsvSink, writing one JSON object per line."""
+
+    def __init__(self, path, fieldnames, key_field="key"):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.key_field = key_field
+        self.written = 0
+        self._keys = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._keys = {str(json.loads(line).get(key_field)) for line in f if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, job):
+        self._file.write(json.dumps({k: job.get(k) for k in self.fieldnames}) + "\n")
+        self._file.flush()
+        self._keys.add(str(job.get(self.key_field)))
+        self.written += 1
+
+
+def open_sink(path, fieldnames, key_field="key"):
+    """Opens a JsonlSink for .jsonl paths and a CsvSink otherwise."""
+    sink_class = JsonlSink if path.endswith(".jsonl") else CsvSink
+    return sink_class(path, fieldnames, key_field)
+
+
+async def run_pipeline(jobs, fetch, score, sink, concurrency=5, keep=None, score_field="match_score", scorers=1):
+    """
+    Streams jobs through filter -> fetch -> score -> sink.
+
+    Stages are connected by bounded queues, so at most a few descriptions are
+    held in memory at any time, and each job is written as soon as it is
+    scored. The description is dropped once the score is computed.
+
+    Args:
+        jobs: Iterable of job dicts.
+        fetch: Coroutine function returning a job's description, or None.
+            It must not store the description on the job, or every
+            description stays referenced from `jobs` until the run ends.
+        score: Function (or coroutine function, e.g. one awaiting a process
+            pool) mapping a description to a score.
+        sink: CsvSink or JsonlSink the scored jobs are appended to.
+        concurrency: Number of concurrent fetch workers.
+        keep: Optional predicate; jobs it rejects are not fetched.
+        score_field: Job field the score is stored in.
+        scorers: Number of descriptions scored at once; more than one only
+            helps when `score` is a coroutine function handing work to other processes.
+
+    Returns:
+        int: Number of jobs written to the sink.
+    """
+    fetch_queue = asyncio.Queue(maxsize=concurrency * 2)
+    score_queue = asyncio.Queue(maxsize=concurrency * 2)
+    written_before = sink.written
+
+    async def produce():
+        for job in jobs:
+            if (keep is None or keep(job)) and not sink.seen(job):
+                await fetch_queue.put(job)
+        for _ in range(concurrency):
+            await fetch_queue.put(_DONE)
+
+    async def fetch_worker():
+        while True:
+            job = await fetch_queue.get()
+            if job is _DONE:
+                return
+            try:
+                description = await fetch(job)
+            except Exception as e:
+                print(f"Error fetching {job.get('title', job)}: {e}")
+                continue
+            if description:
+                await score_queue.put((job, description))
+
+    async def fetch_stage():
+        await asyncio.gather(produce(), *[fetch_worker() for _ in range(concurrency)])
+        for _ in range(scorers):
+            await score_queue.put(_DONE)
+
+    async def score_and_write():
+        while True:
+            item = await score_queue.get()
+            if item is _DONE:
+                return
+            job, description = item
+            value = score(description)
+            if inspect.isawaitable(value):
+                value = await value
+            job[score_field] = round(value, 2)
+            sink.write(job)
+
+    await asyncio.gather(fetch_stage(), *[score_and_write() for _ in range(max(1, scorers))])
+    return sink.written - written_before
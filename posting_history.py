@@ -0,0 +1,264 @@
+"""
+Local history of every posting seen on Adobe, Dropbox and PSN.
+
+Each scraper run upserts the postings it listed (first_seen / last_seen are
+maintained automatically) and the scores it computed per resume. Query it
+from the command line, e.g. new US data roles this week above 40% fit:
+
+    python3 posting_history.py --new-days 7 --us --title data --min-score 40
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from job_store import JobRecord
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "posting_history.sqlite")
+US_RE = re.compile(r"\bUS\b|\bUSA\b|UNITED STATES")
+QUERY_FIELDS = ["board", "job_key", "title", "location", "department", "first_published", "first_seen", "last_seen",
+                "resume", "score", "url"]
+
+
+def resume_name(resume_path):
+    """Names a resume in the history by its file name without extension."""
+    return os.path.splitext(os.path.basename(resume_path))[0]
+
+
+class PostingHistory:
+    """
+    SQLite store of every posting ever seen and the scores it received.
+
+    `postings` holds one row per board and job key with its latest title,
+    url, location, department and Greenhouse dates, plus when it was first
+    and last seen. `scores` holds the latest score per posting and resume.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS postings (
+                   board TEXT NOT NULL,
+                   job_key TEXT NOT NULL,
+                   title TEXT,
+                   url TEXT,
+                   location TEXT,
+                   department TEXT,
+                   is_us INTEGER NOT NULL DEFAULT 0,
+                   first_published TEXT,
+                   updated_at TEXT,
+                   first_seen REAL NOT NULL,
+                   last_seen REAL NOT NULL,
+                   PRIMARY KEY (board, job_key));
+               CREATE TABLE IF NOT EXISTS scores (
+                   board TEXT NOT NULL,
+                   job_key TEXT NOT NULL,
+                   resume TEXT NOT NULL,
+                   score REAL NOT NULL,
+                   scored_at REAL NOT NULL,
+                   PRIMARY KEY (board, job_key, resume));
+               CREATE INDEX IF NOT EXISTS idx_postings_first_seen ON postings (first_seen);
+               CREATE INDEX IF NOT EXISTS idx_postings_last_seen ON postings (last_seen);
+               CREATE INDEX IF NOT EXISTS idx_postings_department ON postings (department);
+               CREATE INDEX IF NOT EXISTS idx_postings_location ON postings (location);
+               CREATE INDEX IF NOT EXISTS idx_scores_resume_score ON scores (resume, score);""")
+        self._conn.commit()
+
+    def record(self, board, jobs, resume=None, seen_at=None):
+        """
+        Upserts the postings seen in a run, and their scores when a resume is given.
+
+        Args:
+            board: Board name, e.g. "adobe".
+            jobs: Job dicts as produced by the board's scraper.
+            resume: Resume name the jobs' match_score/fit_score belongs to.
+            seen_at: Time of the run (default: now).
+
+        Returns:
+            int: Number of postings recorded.
+        """
+        seen_at = seen_at or time.time()
+        records = [JobRecord.from_job(board, job) for job in jobs]
+        self._conn.executemany(
+            """INSERT INTO postings (board, job_key, title, url, location, department, is_us, first_published,
+                                     updated_at, first_seen, last_seen)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (board, job_key) DO UPDATE SET
+                   title = excluded.title, url = excluded.url, location = excluded.location,
+                   department = COALESCE(NULLIF(excluded.department, ''), postings.department),
+                   is_us = excluded.is_us,
+                   first_published = COALESCE(excluded.first_published, postings.first_published),
+                   updated_at = COALESCE(excluded.updated_at, postings.updated_at),
+                   last_seen = excluded.last_seen""",
+            [(r.board, r.key, r.title, r.url, r.location, r.department, int(bool(US_RE.search(r.location.upper()))),
+              r.first_published, r.updated_at, seen_at, seen_at) for r in records])
+        if resume:
+            self._insert_scores([(r.board, r.key, resume, r.match_score, seen_at)
+                                 for r in records if r.match_score is not None])
+        self._conn.commit()
+        return len(records)
+
+    def record_scores(self, board, jobs, resume_names, scores, scored_at=None):
+        """
+        Stores a (resumes x jobs) score matrix from a multi-resume run.
+
+        The jobs must already have been recorded with `record`.
+        """
+        scored_at = scored_at or time.time()
+        keys = [JobRecord.from_job(board, job).key for job in jobs]
+        self._insert_scores([(board, key, name, float(score), scored_at)
+                             for name, row in zip(resume_names, scores) for key, score in zip(keys, row)])
+        self._conn.commit()
+
+    def _insert_scores(self, rows):
+        self._conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", rows)
+
+    def query(self, board=None, title=None, location=None, department=None, us_only=False, new_days=None,
+              seen_days=None, min_score=None, resume=None, limit=None):
+        """
+        Finds postings matching all the given filters, best score first.
+
+        Args:
+            board: Only this board.
+            title: Case-insensitive title substrings; a posting matches if any is present.
+            location: Case-insensitive location substring.
+            department: Case-insensitive department substring.
+            us_only: Only US-based postings.
+            new_days: Only postings first seen in the last `new_days` days.
+            seen_days: Only postings still listed in the last `seen_days` days.
+            min_score: Only postings scored at least this (for `resume`, or any resume).
+            resume: Only scores for this resume.
+            limit: Maximum number of rows.
+
+        Returns:
+            list: Dicts with QUERY_FIELDS; score and resume are None for unscored postings.
+        """
+        now = time.time()
+        join = "JOIN" if min_score is not None or resume else "LEFT JOIN"
+        conditions, params = [], []
+        if resume:
+            join_condition = "s.board = p.board AND s.job_key = p.job_key AND s.resume = ?"
+            params.append(resume)
+        else:
+            join_condition = "s.board = p.board AND s.job_key = p.job_key"
+        if board:
+            conditions.append("p.board = ?")
+            params.append(board)
+        if title:
+            conditions.append("(" + " OR ".join("p.title LIKE ?" for _ in title) + ")")
+            params.extend(f"%{word}%" for word in title)
+        if location:
+            conditions.append("p.location LIKE ?")
+            params.append(f"%{location}%")
+        if department:
+            conditions.append("p.department LIKE ?")
+            params.append(f"%{department}%")
+        if us_only:
+            conditions.append("p.is_us = 1")
+        if new_days is not None:
+            conditions.append("p.first_seen >= ?")
+            params.append(now - new_days * 86400)
+        if seen_days is not None:
+            conditions.append("p.last_seen >= ?")
+            params.append(now - seen_days * 86400)
+        if min_score is not None:
+            conditions.append("s.score >= ?")
+            params.append(min_score)
+        sql = (f"SELECT p.board, p.job_key, p.title, p.location, p.department, p.first_published, p.first_seen, "
+               f"p.last_seen, s.resume, s.score, p.url FROM postings p {join} scores s ON {join_condition}"
+               + (" WHERE " + " AND ".join(conditions) if conditions else "")
+               + " ORDER BY s.score IS NULL, s.score DESC, p.first_seen DESC")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = []
+        for row in self._conn.execute(sql, params):
+            row = dict(row)
+            for field in ("first_seen", "last_seen"):
+                row[field] = datetime.fromtimestamp(row[field]).strftime("%Y-%m-%d %H:%M")
+            rows.append(row)
+        return rows
+
+    def stats(self):
+        """Returns per-board counts of postings, US postings and scores."""
+        return [dict(row) for row in self._conn.execute(
+            """SELECT p.board, COUNT(*) AS postings, SUM(p.is_us) AS us_postings,
+                      (SELECT COUNT(*) FROM scores s WHERE s.board = p.board) AS scores,
+                      datetime(MIN(p.first_seen), 'unixepoch', 'localtime') AS first_seen,
+                      datetime(MAX(p.last_seen), 'unixepoch', 'localtime') AS last_seen
+               FROM postings p GROUP BY p.board ORDER BY p.board""")]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def add_history_argument(parser):
+    """Adds the --history option shared by every scraper."""
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH,
+                        help="SQLite file recording every posting seen and its scores (empty string disables)")
+
+
+def print_table(rows, fields):
+    widths = {field: min(60, max([len(field)] + [len(str(row[field] if row[field] is not None else ""))
+                                                 for row in rows])) for field in fields}
+    print("  ".join(field.ljust(widths[field]) for field in fields))
+    for row in rows:
+        print("  ".join(str(row[field] if row[field] is not None else "")[:widths[field]].ljust(widths[field])
+                        for field in fields))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the history of postings seen across all boards.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="History database file")
+    parser.add_argument("--board", choices=["adobe", "dropbox", "psn"], help="Only this board")
+    parser.add_argument("--title", nargs="+", help="Title contains any of these words (case-insensitive)")
+    parser.add_argument("--location", help="Location contains this text")
+    parser.add_argument("--department", help="Department contains this text")
+    parser.add_argument("--us", action="store_true", help="Only US-based postings")
+    parser.add_argument("--new-days", type=float, help="Only postings first seen in the last N days")
+    parser.add_argument("--seen-days", type=float, help="Only postings still listed in the last N days")
+    parser.add_argument("--min-score", type=float, help="Only postings scored at least this percentage")
+    parser.add_argument("--resume", help="Only scores for this resume (file name without extension)")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum rows to show (0 for all)")
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table", help="Output format")
+    parser.add_argument("--stats", action="store_true", help="Show per-board totals instead of postings")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.history):
+        print(f"No history found at {args.history}; run a scraper first")
+        return
+    with PostingHistory(args.history) as history:
+        if args.stats:
+            rows = history.stats()
+            fields = ["board", "postings", "us_postings", "scores", "first_seen", "last_seen"]
+        else:
+            rows = history.query(args.board, args.title, args.location, args.department, args.us, args.new_days,
+                                 args.seen_days, args.min_score, args.resume, args.limit or None)
+            fields = QUERY_FIELDS
+
+    if args.format == "json":
+        print(json.dumps(rows, indent=2))
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print_table(rows, fields)
+        print(f"{len(rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
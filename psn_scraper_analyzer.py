@@ -3,152 +3,213 @@ import os
 import argparse
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
 import re
-import pandas as pd
+import heapq
 import math
 
-# Ensure required NLTK resources are available
-nltk.download("stopwords")
+from concurrent_fetch import HostRateLimiter, map_threaded
+from dedupe import DEFAULT_THRESHOLD, mark_duplicates
+from html_parsing import extract_greenhouse_description
+from http_client import HttpClient
+from job_cache import add_cache_arguments, open_cache
+from keyword_matcher import KeywordMatcher
+from listing_snapshot import ListingSnapshot, write_new_since_last_run
+from metrics import add_metrics_arguments, incr, timer, write_run_metrics
+from parallel_scoring import ScoringPool, add_workers_argument
+from posting_history import PostingHistory, add_history_argument, resume_name
+from resume_index import ResumeIndex, load_resumes
+from batch_report import write_batch_results
+from text_processing import print_stem_cache_stats
+
+JOBS_API_URL = "https://boards-api.greenhouse.io/v1/boards/sonyinteractiveentertainmentglobal/jobs"
+US_LOCATION = "united states"
+DEPARTMENT_FIELD = "Career Page - Department"
 
 def get_working_dir():
     return os.path.abspath(os.path.dirname(__file__))
 
-def scrape_sony_careers(all_jobs, keywords_file):
+def location_of(job):
+    """Returns the posting's location name ("" when missing)."""
+    location = job.get('location')
+    return (location.get('name') or '') if isinstance(location, dict) else ''
+
+def department_of(job):
+    """Returns the "Career Page - Department" metadata value, or "N/A"."""
+    for item in job.get('metadata') or []:
+        if item.get('name') == DEPARTMENT_FIELD and item.get('value'):
+            return item['value']
+    return "N/A"
+
+def top_fraction_threshold(scores, fraction):
+    """
+    Returns the lowest score among the top `fraction` of scores.
+
+    Only the top k = ceil(fraction * n) scores are selected (heap based,
+    O(n log k)) instead of sorting them all.
+    """
+    k = max(1, math.ceil(fraction * len(scores)))
+    return heapq.nlargest(k, scores)[-1]
+
+def scrape_sony_careers(all_jobs, keywords_file, client=None, url=JOBS_API_URL):
     """
     Fetches job postings via the API and filters out US-based jobs that
     have a role title match in the top 20% when compared to keywords in keywords.txt.
     Also extracts department and first_published date.
+    Requests go through `client` (an HttpClient) when given; otherwise a
+    client is opened for this call and closed afterwards.
     """
+    if client is None:
+        with HttpClient() as client:
+            return scrape_sony_careers(all_jobs, keywords_file, client, url)
     # Read keywords from the file
     keywords_path = os.path.join(get_working_dir(), keywords_file)
     try:
-        with open(keywords_path, "r", encoding="utf-8") as f:
-            keywords = [kw.strip().lower() for kw in f.readlines() if kw.strip()]
+        keywords = KeywordMatcher.from_file(keywords_path)
     except FileNotFoundError:
         print("Keywords file not found.")
         return
     
-    url = "https://boards-api.greenhouse.io/v1/boards/sonyinteractiveentertainmentglobal/jobs"
     try:
-        response = requests.get(url)
+        response = client.get(url)
         if response.status_code == 200:
             data = response.json()
-            jobs_df = pd.DataFrame(data['jobs'])
-            jobs_df['location_name'] = jobs_df['location'].apply(lambda x: x['name'] if isinstance(x, dict) else '')
-            # Filter for US-based jobs
-            filtered_jobsdf = jobs_df[jobs_df['location_name'].str.contains('United States', case=False, na=False)]
-            
-            # Calculate match score for each job based on role title and keywords
+            incr("listing_pages")
+            incr("jobs_listed", len(data['jobs']))
+            # Calculate match score for each US-based job based on role title and keywords
             job_list = []
-            for _, row in filtered_jobsdf.iterrows():
-                role_title = row['title'].lower()
-                match_scores = []
-                for kw in keywords:
-                    if kw in role_title:
+            with timer("keyword_filter"):
+                for job in data['jobs']:
+                    location_name = location_of(job)
+                    if US_LOCATION not in location_name.lower():
+                        continue
+                    role_title = (job.get('title') or '').lower()
+                    best_keyword = keywords.longest_match(role_title) if role_title else None
+                    if best_keyword:
                         # Score: length of the keyword divided by length of role title
-                        match_scores.append(len(kw) / len(role_title))
-                if match_scores:
-                    best_match_score = max(match_scores)
-                    job_list.append((row, best_match_score))
+                        job_list.append((job, location_name, len(best_keyword) / len(role_title)))
             
             if not job_list:
                 print("No jobs matched the keywords in the role title.")
                 return
             
-            # Determine the threshold for top 20% match score
-            scores = [score for (_, score) in job_list]
-            scores_sorted = sorted(scores)
-            n = len(scores_sorted)
-            k = math.ceil(0.2 * n)  # number of jobs in the top 20%
-            cutoff_index = n - k  # index for the cutoff in ascending sorted order
-            threshold = scores_sorted[cutoff_index]
-            
-            # Only add jobs with match score >= threshold
-            for row, score in job_list:
+            # Only add jobs with a match score in the top 20%
+            threshold = top_fraction_threshold([score for (_, _, score) in job_list], 0.2)
+            for job, location_name, score in job_list:
                 if score >= threshold:
-                    # Extract department from metadata (using "Career Page - Department") if available
-                    department = "N/A"
-                    metadata = row.get('metadata', [])
-                    for item in metadata:
-                        if item.get('name') == "Career Page - Department" and item.get('value'):
-                            department = item.get('value')
-                            break
-                    
-                    job_dict = {
-                        "role": row['title'],
-                        "role_url": row['absolute_url'],
-                        "department": department,
-                        "location": row['location_name'],
-                        "first_published": row.get("first_published", "N/A"),
+                    all_jobs.append({
+                        "job_id": job['id'],
+                        "role": job['title'],
+                        "role_url": job['absolute_url'],
+                        "department": department_of(job),
+                        "location": location_name,
+                        "first_published": job.get("first_published", "N/A"),
+                        "updated_at": job.get("updated_at"),
                         "description": ""  # Placeholder; to be updated later
-                    }
-                    all_jobs.append(job_dict)
+                    })
+                    incr("jobs_matched")
             print(f"API call successful: Found {len(all_jobs)} US-based jobs after keyword filtering.")
         else:
+            incr("fetch_errors")
             print(f"Failed to retrieve data, status code {response.status_code}")
     except Exception as e:
+        incr("fetch_errors")
         print(f"Error fetching API data: {e}")
 
-def scrape_job_descriptions(jobs, output_folder):
+def scrape_job_description(job, output_folder, client, limiter=None, cache=None, store_on_job=True):
+    """
+    Scrapes one job's description, saves it to a file and stores it on the job dict.
+    Descriptions already in `cache` (a JobCache) are not fetched again. With
+    `store_on_job=False` the description is only returned, so callers that
+    stream jobs do not keep every description alive through the job dicts.
+
+    Returns:
+        str: The description, or None if it could not be fetched.
+    """
+    job_key = job.get("job_id") or job["role_url"]
+    role_filename = re.sub(r'[<>:"/\\|?*]', '_', job["role"])[:50] + f"_{job_key}.txt"
+    filepath = os.path.join(output_folder, role_filename)
+    
+    if cache:
+        cached = cache.get("psn", job_key)
+        if cached is not None:
+            if store_on_job:
+                job["description"] = cached
+            if not os.path.exists(filepath):
+                with open(filepath, "w", encoding="utf-8") as f:
+                    f.write(cached)
+            return cached
+    
+    if limiter:
+        limiter.wait_sync(job["role_url"])
+    try:
+        # Descriptions are kept in JobCache, so only the listing uses conditional GETs
+        response = client.get(job["role_url"], conditional=False)
+        response.raise_for_status()
+        job_description = extract_greenhouse_description(response.content)
+        if job_description:
+            incr("descriptions_fetched")
+            if store_on_job:
+                job["description"] = job_description  # Store the description
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.write(job_description)
+            if cache:
+                cache.put("psn", job_key, job_description, url=job["role_url"], title=job["role"])
+            print(f"Scraped: {job['role']}")
+            return job_description
+    except requests.exceptions.RequestException as e:
+        incr("fetch_errors")
+        print(f"Error fetching job description: {e}")
+    return None
+
+def scrape_job_descriptions(jobs, output_folder, concurrency=5, limiter=None, client=None, cache=None):
     """
     Scrapes job descriptions from each job's URL and saves the text to a file.
     The job dict is updated with the description.
+    Pages are fetched on a pool of `concurrency` threads, optionally rate limited per host.
+    Descriptions already in `cache` (a JobCache) are not fetched again.
+    Without a `client`, one is opened for this call and closed afterwards.
     """
+    if client is None:
+        with HttpClient(pool_size=concurrency) as client:
+            return scrape_job_descriptions(jobs, output_folder, concurrency, limiter, client, cache)
     os.makedirs(output_folder, exist_ok=True)
-    
-    for job in jobs:
-        role_filename = re.sub(r'[<>:"/\\|?*]', '_', job["role"])[:50] + ".txt"
-        filepath = os.path.join(output_folder, role_filename)
-        
-        try:
-            response = requests.get(job["role_url"])
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "html.parser")
-            description_element = soup.find("div", class_="job__description")
-            if description_element:
-                job_description = description_element.get_text(separator='\n', strip=True)
-                job["description"] = job_description  # Store the description
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(job_description)
-                print(f"Scraped: {job['role']}")
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching job description: {e}")
+    map_threaded(jobs, lambda job: scrape_job_description(job, output_folder, client, limiter, cache),
+                 concurrency=concurrency)
 
-def analyze_resume(resume_file, jobs):
+def analyze_resume(resume_file, jobs, dedupe_threshold=None, workers=0):
     """
-    Analyzes the resume against each job's description by comparing text overlap,
+    Analyzes the resume against each job's description using TF-IDF cosine similarity,
     calculates a fit_score for each job, and sorts the jobs by fit_score.
+    The resume is tokenized and stemmed once (and cached on disk by content hash).
+    Near-duplicate descriptions are scored once when `dedupe_threshold` is set
+    (the copies get the role_url they were scored with as `duplicate_of`),
+    and descriptions are stemmed on `workers` processes (0 stems in this process).
+
+    Returns:
+        list: The jobs sorted by fit_score, or None when the resume could not
+            be read or has no usable terms (nothing was scored).
     """
     resume_path = os.path.join(get_working_dir(), resume_file)
     
-    def read_file(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read()
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-            return ""
-    
-    resume_text = read_file(resume_path)
-    if not resume_text:
-        return []
-    
-    stop_words = set(stopwords.words("english"))
-    stemmer = PorterStemmer()
+    try:
+        resume_index = ResumeIndex.load(resume_path)
+    except Exception as e:
+        print(f"Error reading {resume_path}: {e}")
+        return None
+    if not resume_index.stems:
+        print(f"No usable terms in {resume_path}")
+        return None
     
+    described = [job for job in jobs if job.get("description")]
     for job in jobs:
-        job_text = job.get("description", "")
-        if job_text:
-            resume_words = {stemmer.stem(word) for word in re.findall(r'\b\w+\b', resume_text.lower()) if word not in stop_words}
-            job_words = {stemmer.stem(word) for word in re.findall(r'\b\w+\b', job_text.lower()) if word not in stop_words}
-            fit_score = (len(resume_words & job_words) / len(job_words)) * 100 if job_words else 0
-            job["fit_score"] = fit_score
-        else:
-            job["fit_score"] = 0
+        job["fit_score"] = 0
+    with ScoringPool([resume_index], workers) as scoring:
+        scores, cluster_of = scoring.score_matrix_sync([job["description"] for job in described], dedupe_threshold,
+                                                       return_clusters=True)
+    mark_duplicates(described, cluster_of, "role_url")
+    for job, fit_score in zip(described, scores[0].tolist()):
+        job["fit_score"] = fit_score
+    print_stem_cache_stats()
     
     jobs.sort(key=lambda x: x["fit_score"], reverse=True)
     return jobs
@@ -157,38 +218,104 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("-r", "--resume", default="resume.txt", help="Path to the resume file")
     parser.add_argument("-k", "--keywords", default="keywords.txt", help="Keywords file (one keyword/phrase per line)")
+    parser.add_argument("--resumes", help="Directory of resumes or manifest file; scores every resume in one run")
+    parser.add_argument("--concurrency", type=int, default=5, help="Number of job descriptions fetched in parallel")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum requests per second per host (0 disables)")
+    parser.add_argument("--http-cache", default=os.path.join(get_working_dir(), ".http_cache"),
+                        help="Directory for ETag/Last-Modified revalidation data (empty string disables)")
+    add_cache_arguments(parser)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch and score postings that are new or changed since the last run")
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Score near-duplicate descriptions (MinHash similarity at least this) once (0 disables)")
+    add_workers_argument(parser)
+    add_metrics_arguments(parser)
+    add_history_argument(parser)
     args = parser.parse_args()
-    
+    # Closing the client also trims its ETag store to the size cap, so every exit path must go through it
+    with HttpClient(cache_dir=args.http_cache or None, pool_size=max(10, args.concurrency)) as client:
+        run(args, client)
+
+def run(args, client):
+    """Lists, fetches and scores the PSN jobs as requested by the parsed command line `args`."""
     # Rename output directory to "psn_output"
     output_folder = os.path.join(get_working_dir(), "psn_output")
     os.makedirs(output_folder, exist_ok=True)
     
     print("Fetching jobs via API...")
     all_jobs = []
-    scrape_sony_careers(all_jobs, args.keywords)
+    scrape_sony_careers(all_jobs, args.keywords, client)
     print(f"Found {len(all_jobs)} total jobs after initial filtering")
     
     if not all_jobs:
         print("No jobs to process after keyword filtering.")
+        write_run_metrics(args, "psn")
         return
     
+    snapshot = ListingSnapshot("psn", "job_id", ["role", "role_url", "department", "location"])
+    jobs_to_process = all_jobs
+    if args.incremental:
+        diff = snapshot.diff(all_jobs)
+        jobs_to_process = diff.added + diff.changed
+        print(f"Incremental run: {len(jobs_to_process)} new or changed jobs, {len(diff.unchanged)} unchanged")
+    
     print("\nScraping job descriptions...")
-    scrape_job_descriptions(all_jobs, output_folder)
+    cache = open_cache(args)
+    scrape_job_descriptions(jobs_to_process, output_folder, args.concurrency, HostRateLimiter(rate=args.rate), client, cache)
+    if cache:
+        print(f"Description cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
     
-    print("\nAnalyzing resume...")
-    matched_jobs = analyze_resume(args.resume, all_jobs)
+    timestamp = datetime.now().strftime("%d%m%Y")
+    if args.resumes:
+        print("\nAnalyzing resumes...")
+        resumes = load_resumes(args.resumes)
+        described = [job for job in jobs_to_process if job["description"]]
+        if described:
+            with ScoringPool(list(resumes.values()), args.workers) as scoring:
+                scores, cluster_of = scoring.score_matrix_sync([job["description"] for job in described],
+                                                               args.dedupe_threshold, return_clusters=True)
+            mark_duplicates(described, cluster_of, "role_url")
+            write_batch_results(output_folder, "psn", list(resumes), described, scores,
+                                ["role", "role_url", "department", "location", "first_published", "duplicate_of"],
+                                "job_id", timestamp, score_field="fit_score")
+        matched_jobs = []
+    else:
+        print("\nAnalyzing resume...")
+        matched_jobs = analyze_resume(args.resume, jobs_to_process, args.dedupe_threshold, args.workers)
+    if args.history:
+        with PostingHistory(args.history) as history:
+            history.record("psn", all_jobs)
+            if args.resumes and described:
+                history.record_scores("psn", described, list(resumes), scores)
+            elif not args.resumes and matched_jobs is not None:
+                # Jobs without a description got a placeholder fit_score of 0; only real scores are kept
+                history.record("psn", [job for job in jobs_to_process if job["description"]], resume_name(args.resume))
     
-    if matched_jobs:
+    if matched_jobs is None:
+        # Nothing was scored, so the snapshot is left as it was and these postings are scored next run
+        write_run_metrics(args, "psn")
+        return
+    if args.incremental:
+        write_new_since_last_run(os.path.join(output_folder, f"new_since_last_run_{timestamp}.csv"), diff,
+                                 ["role", "role_url", "department", "location", "first_published", "fit_score",
+                                  "duplicate_of"])
+    elif matched_jobs:
         csv_path = os.path.join(output_folder, "filtered_jobs.csv")
         # Write only the selected fields to CSV
-        fieldnames = ["role", "role_url", "department", "location", "first_published", "fit_score"]
+        fieldnames = ["role", "role_url", "department", "location", "first_published", "fit_score", "duplicate_of"]
         with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows([{k: job.get(k, "") for k in fieldnames} for job in matched_jobs])
         print(f"\nSaved {len(matched_jobs)} matching jobs to {csv_path}")
-    else:
+    elif not args.resumes:
         print("No matching jobs found.")
 
+    # Saved only once the results are written, so an interrupted run scores the same postings again.
+    # Postings whose description could not be fetched stay out of the snapshot so they are retried
+    snapshot.save((diff.unchanged if args.incremental else []) + [job for job in jobs_to_process if job["description"]])
+    write_run_metrics(args, "psn")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from collections import Counter
+
+from metrics import timer
+from text_processing import stem_tokens, terms
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), ".resume_index")
+
+
+class ResumeIndex:
+    """
+    A resume tokenized and stemmed once, ready to be scored against many jobs.
+
+    Attributes:
+        digest: sha256 of the resume text, used as the on-disk key.
+        stems: Set of stemmed, stopword-free resume terms.
+        term_freq: Counter of stemmed terms.
+    """
+
+    def __init__(self, digest, term_freq):
+        self.digest = digest
+        self.term_freq = Counter(term_freq)
+        self.stems = frozenset(self.term_freq)
+
+    @classmethod
+    def from_text(cls, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return cls(digest, Counter(stem_tokens(text)))
+
+    @classmethod
+    def load(cls, resume_path, index_dir=DEFAULT_INDEX_DIR):
+        """
+        Builds the index for a resume file, reusing a serialized copy when the text is unchanged.
+
+        Args:
+            resume_path: Path to the resume text file.
+            index_dir: Directory holding serialized indexes, or None to skip the disk.
+
+        Returns:
+            ResumeIndex: The index for the resume.
+        """
+        with open(resume_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if index_dir:
+            index_path = os.path.join(index_dir, digest + ".json")
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    return cls(digest, json.load(f)["term_freq"])
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls(digest, Counter(stem_tokens(text)))
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump({"term_freq": index.term_freq}, f)
+        return index
+
+
+@timer("scoring")
+def score_description(resume_index, job_description):
+    """
+    Scores a job description against a prepared resume.
+
+    Returns:
+        float: Percentage of the description's distinct terms that appear in the resume.
+    """
+    job_words = terms(job_description)
+    return len(resume_index.stems & job_words) / len(job_words) * 100 if job_words else 0
+
+
+def load_resumes(path, index_dir=DEFAULT_INDEX_DIR):
+    """
+    Loads every resume named by a directory or a manifest file.
+
+    Args:
+        path: Directory of .txt resumes, or a manifest listing one resume path
+            per line (relative paths are resolved against the manifest).
+        index_dir: Directory holding serialized indexes, or None to skip the disk.
+
+    Returns:
+        dict: Resume name (file name without extension) -> ResumeIndex, in load order.
+    """
+    if os.path.isdir(path):
+        resume_paths = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".txt")]
+    else:
+        base_dir = os.path.dirname(os.path.abspath(path))
+        with open(path, "r", encoding="utf-8") as f:
+            resume_paths = [os.path.join(base_dir, line.strip()) for line in f
+                            if line.strip() and not line.startswith("#")]
+    resumes = {}
+    for resume_path in resume_paths:
+        name = os.path.splitext(os.path.basename(resume_path))[0]
+        if name in resumes:
+            name = f"{name}_{len(resumes)}"
+        resumes[name] = ResumeIndex.load(resume_path, index_dir)
+    print(f"Loaded {len(resumes)} resumes from {path}")
+    return resumes
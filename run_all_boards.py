@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import adobe_scaper_analyzer as adobe
+import dropbox_scraper_analyzer as dropbox
+import psn_scraper_analyzer as psn
+from browser_pool import BrowserPool, ResourceBlocker
+from concurrent_fetch import HostRateLimiter
+from dedupe import DEFAULT_THRESHOLD, mark_duplicates
+from http_client import HttpClient
+from job_cache import DEFAULT_CACHE_PATH, JobCache, add_cache_arguments, cache_options
+from job_store import JobStore
+from keyword_matcher import KeywordMatcher
+from metrics import add_metrics_arguments, write_run_metrics
+from parallel_scoring import ScoringPool, add_workers_argument
+from pipeline import open_sink, run_pipeline
+from posting_history import PostingHistory, add_history_argument, resume_name
+from resume_index import ResumeIndex
+
+# duplicate_of holds the url of the posting a near-duplicate was scored with (see dedupe.py)
+MERGED_FIELDS = ["board", "title", "location", "url", "key", "match_score", "duplicate_of"]
+# Streamed jobs are scored one at a time, without corpus-wide TF-IDF weights, so their
+# score is the term overlap of score_description and gets its own column
+STREAM_FIELDS = ["board", "title", "location", "url", "key", "overlap_score"]
+
+
+class RunContext:
+    """
+    Shared resources handed to every board adapter.
+
+    `budget` is the global concurrency budget: every listing page and
+    description fetch of every board holds one slot while it runs.
+    """
+
+    def __init__(self, pool, client, budget, limiter, cache, keywords_file):
+        self.pool = pool
+        self.client = client
+        self.budget = budget
+        self.limiter = limiter
+        self.cache = cache
+        self.keywords_file = keywords_file
+
+    async def throttle(self, board, job):
+        """
+        Waits for the per-host rate limiter before a description fetch takes a budget slot.
+
+        Sleeping here rather than inside the budget keeps a throttled host from
+        holding slots the other boards could use. Cached descriptions are not
+        throttled, as they make no request.
+        """
+        if self.cache and self.cache.is_fresh(board, job["key"]):
+            return
+        await self.limiter.wait(job["url"])
+
+    async def run_blocking(self, func, *args):
+        """Runs a blocking call on the default thread pool within the budget."""
+        async with self.budget:
+            return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+
+class BoardAdapter(ABC):
+    """
+    Interface every job board plugs into the runner with.
+
+    `list_jobs` returns the board's filtered listings as job dicts with at
+    least `title`, `url`, `location` and `key`; `fetch_description` returns a
+    job's description text, or None when it could not be fetched. The
+    description must not be left on the job dict: the runners keep every job
+    dict until the end, and streaming relies on descriptions being dropped once scored.
+    """
+
+    name = ""
+
+    @abstractmethod
+    async def list_jobs(self, ctx):
+        """Returns the board's filtered job dicts."""
+
+    @abstractmethod
+    async def fetch_description(self, job, ctx):
+        """Returns the job's description text, or None."""
+
+
+class AdobeBoard(BoardAdapter):
+    name = "adobe"
+
+    async def list_jobs(self, ctx):
+        keywords = KeywordMatcher.from_file(ctx.keywords_file)
+        raw_jobs = []
+
+        async def scrape(offset):
+            async with ctx.budget:
+                await adobe.scrape_page(offset, raw_jobs, keywords, ctx.pool, ctx.client)
+
+        await asyncio.gather(*[scrape(offset) for offset in range(0, 100, 10)])
+        return [dict(job, title=job["role"], url=job["role_url"], key=job["req_id"]) for job in raw_jobs]
+
+    async def fetch_description(self, job, ctx):
+        await ctx.throttle(self.name, job)
+        async with ctx.budget:
+            return await adobe.scrape_job_description(job, ctx.pool, ctx.cache, None, ctx.client)
+
+
+class DropboxBoard(BoardAdapter):
+    name = "dropbox"
+
+    async def list_jobs(self, ctx):
+        os.makedirs(dropbox.OUTPUT_FOLDER, exist_ok=True)
+        async with ctx.budget:
+            raw_jobs = await dropbox.fetch_jobs(ctx.pool, ctx.client)
+        return [dict(job, url=job["link"], key=dropbox.job_key(job)) for job in raw_jobs]
+
+    async def fetch_description(self, job, ctx):
+        if not job.get("description"):
+            await ctx.throttle(self.name, job)
+        async with ctx.budget:
+            details = await dropbox.scrape_job_details(job, ctx.pool, ctx.cache)
+        # The API listing carries every description; it is handed off and dropped from the job here
+        job.pop("description", None)
+        return details["description"] if details else None
+
+
+class PsnBoard(BoardAdapter):
+    name = "psn"
+
+    def __init__(self):
+        self.output_folder = os.path.join(psn.get_working_dir(), "psn_output")
+
+    async def list_jobs(self, ctx):
+        raw_jobs = []
+        await ctx.run_blocking(psn.scrape_sony_careers, raw_jobs, ctx.keywords_file, ctx.client)
+        return [dict(job, title=job["role"], url=job["role_url"], key=job["job_id"]) for job in raw_jobs]
+
+    async def fetch_description(self, job, ctx):
+        os.makedirs(self.output_folder, exist_ok=True)
+        await ctx.throttle(self.name, job)
+        return await ctx.run_blocking(psn.scrape_job_description, job, self.output_folder, ctx.client,
+                                      None, ctx.cache, False)
+
+
+BOARDS = {board.name: board for board in (AdobeBoard, DropboxBoard, PsnBoard)}
+
+
+def record_listings(history, adapter, jobs):
+    """Upserts every posting a board listed into the history, whether or not its description is fetched later."""
+    if history:
+        history.record(adapter.name, jobs)
+
+
+async def run_board(adapter, ctx, history=None):
+    """
+    Lists one board and fetches all its descriptions.
+
+    Every listed job is recorded in `history` (a PostingHistory) first.
+
+    Returns:
+        list: (job, description) pairs for the jobs whose description was fetched.
+    """
+    try:
+        jobs = await adapter.list_jobs(ctx)
+    except Exception as e:
+        print(f"Error listing {adapter.name} jobs: {e}")
+        return []
+    print(f"{adapter.name}: {len(jobs)} jobs listed")
+    record_listings(history, adapter, jobs)
+    descriptions = await asyncio.gather(*[adapter.fetch_description(job, ctx) for job in jobs],
+                                        return_exceptions=True)
+    fetched = []
+    for job, description in zip(jobs, descriptions):
+        if isinstance(description, Exception):
+            print(f"Error fetching {adapter.name} job {job['title']}: {description}")
+        elif description:
+            job["board"] = adapter.name
+            fetched.append((job, description))
+    print(f"{adapter.name}: {len(fetched)} descriptions fetched")
+    return fetched
+
+
+@asynccontextmanager
+async def open_context(concurrency=10, rate=2.0, cache_path=DEFAULT_CACHE_PATH, keywords_file="keywords.txt",
+                       cache_settings=None):
+    """
+    Creates the shared browser pool, HTTP client and cache, and closes them afterwards.
+
+    `cache_settings` are extra JobCache arguments (ttl_days, max_bytes).
+    """
+    cache = JobCache(cache_path, **(cache_settings or {})) if cache_path else None
+    client = HttpClient(pool_size=max(10, concurrency))
+    try:
+        async with BrowserPool(max_tabs=concurrency, recycle_after=50, blocker=ResourceBlocker(),
+                               headless=True, args=["--no-sandbox"]) as pool:
+            yield RunContext(pool, client, asyncio.Semaphore(concurrency), HostRateLimiter(rate=rate), cache,
+                             keywords_file)
+    finally:
+        client.close()
+        if cache:
+            cache.close()
+
+
+async def run_boards(board_names, resume_index, store, concurrency=10, rate=2.0, cache_path=DEFAULT_CACHE_PATH,
+                     keywords_file="keywords.txt", dedupe_threshold=DEFAULT_THRESHOLD, workers=0,
+                     cache_settings=None, history=None):
+    """
+    Scrapes the given boards concurrently and ranks all their jobs against one resume.
+
+    Reposts with near-identical descriptions, within or across boards, are
+    scored once, and descriptions are stemmed on `workers` processes. Every
+    scored job is added to `store` as a compact JobRecord; the descriptions
+    are left in the store's on-disk cache once scoring is done. Every listed
+    job, fetched or not, is recorded in `history` when one is given.
+
+    Returns:
+        list: JobRecords from every board with a match_score, best match first.
+    """
+    async with open_context(concurrency, rate, cache_path, keywords_file, cache_settings) as ctx:
+        results = await asyncio.gather(*[run_board(BOARDS[name](), ctx, history) for name in board_names])
+
+    fetched = [pair for board_results in results for pair in board_results]
+    with ScoringPool([resume_index], workers) as scoring:
+        scores, cluster_of = await scoring.score_matrix([description for _, description in fetched],
+                                                        dedupe_threshold, return_clusters=True)
+    mark_duplicates([job for job, _ in fetched], cluster_of, "url")
+    for (job, description), score in zip(fetched, scores[0].tolist()):
+        job["match_score"] = round(score, 2)
+        store.add(job["board"], job, description)
+    return store.ranked()
+
+
+async def stream_boards(board_names, resume_index, sink, concurrency=10, rate=2.0, cache_path=DEFAULT_CACHE_PATH,
+                        keywords_file="keywords.txt", workers=0, cache_settings=None, history=None):
+    """
+    Scrapes the given boards concurrently, writing each job to `sink` as soon as it is scored.
+
+    Jobs are scored individually against the resume index with
+    score_description (stored as `overlap_score`, the share of the posting's
+    terms found in the resume, not comparable with the batch TF-IDF
+    `match_score`), so memory stays bounded and results already in the sink survive an interrupted run. With
+    `workers`, up to that many descriptions are scored at once in worker
+    processes while the event loop keeps fetching.
+
+    Every listed job is recorded in `history` when one is given. The overlap
+    scores are not stored there, as the history's scores are TF-IDF match scores.
+
+    Returns:
+        int: Number of jobs written.
+    """
+    async def score(description):
+        return (await scoring.overlap_scores([description]))[0][0]
+
+    async def stream_board(adapter, ctx):
+        try:
+            jobs = await adapter.list_jobs(ctx)
+        except Exception as e:
+            print(f"Error listing {adapter.name} jobs: {e}")
+            return 0
+        record_listings(history, adapter, jobs)
+        for job in jobs:
+            job["board"] = adapter.name
+        written = await run_pipeline(jobs, lambda job: adapter.fetch_description(job, ctx),
+                                     score, sink, concurrency, score_field="overlap_score",
+                                     scorers=max(1, workers))
+        print(f"{adapter.name}: {written} jobs streamed to {sink.path}")
+        return written
+
+    with ScoringPool([resume_index], workers, chunk_size=1) as scoring:
+        async with open_context(concurrency, rate, cache_path, keywords_file, cache_settings) as ctx:
+            counts = await asyncio.gather(*[stream_board(BOARDS[name](), ctx) for name in board_names])
+    return sum(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Adobe, Dropbox and PSN concurrently and rank all jobs.")
+    parser.add_argument("-r", "--resume", default="resume.txt", help="Path to the resume file")
+    parser.add_argument("-k", "--keywords", default="keywords.txt", help="Keywords file (one keyword/phrase per line)")
+    parser.add_argument("--boards", nargs="+", choices=sorted(BOARDS), default=sorted(BOARDS),
+                        help="Boards to scrape (default: all)")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Global number of pages and descriptions fetched at once across all boards")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum requests per second per host (0 disables)")
+    add_cache_arguments(parser)
+    parser.add_argument("--export", metavar="PATH",
+                        help="Also write the ranked jobs to this .parquet (requires pyarrow), .jsonl or .csv file")
+    parser.add_argument("--export-descriptions", action="store_true",
+                        help="Include the job descriptions in the --export file")
+    parser.add_argument("--stream", metavar="PATH",
+                        help="Stream scored jobs to this .csv or .jsonl file as they arrive; "
+                             "jobs already in the file are skipped")
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Score near-duplicate descriptions (MinHash similarity at least this) once (0 disables)")
+    add_workers_argument(parser)
+    add_metrics_arguments(parser)
+    add_history_argument(parser)
+    args = parser.parse_args()
+
+    resume_index = ResumeIndex.load(args.resume)
+    history = PostingHistory(args.history) if args.history else None
+    if args.stream:
+        sink = open_sink(args.stream, STREAM_FIELDS, key_field="url")
+        try:
+            written = asyncio.run(stream_boards(args.boards, resume_index, sink, args.concurrency, args.rate,
+                                                args.cache or None, args.keywords, args.workers,
+                                                cache_options(args), history))
+        finally:
+            sink.close()
+            if history:
+                history.close()
+        print(f"Streamed {written} jobs to {args.stream}")
+        write_run_metrics(args, "all_boards")
+        return
+
+    store = JobStore(args.cache or None, **cache_options(args))
+    try:
+        ranked = asyncio.run(run_boards(args.boards, resume_index, store, args.concurrency, args.rate,
+                                        args.cache or None, args.keywords, args.dedupe_threshold,
+                                        args.workers, cache_options(args), history))
+        if ranked:
+            output_file = f"all_boards_ranked_{datetime.now().strftime('%d%m%Y')}.csv"
+            store.to_csv(output_file, MERGED_FIELDS, ranked)
+            print(f"Ranked {len(ranked)} jobs from {', '.join(args.boards)}. Results saved to {output_file}")
+            if args.export:
+                store.export(args.export, records=ranked, descriptions=args.export_descriptions)
+                print(f"Ranked jobs exported to {args.export}")
+            if history:
+                # The listings are already recorded; this adds the scores of the jobs that were fetched
+                for board in args.boards:
+                    history.record(board, [record for record in ranked if record.board == board],
+                                   resume_name(args.resume))
+        else:
+            print("No jobs were found to save")
+    finally:
+        store.close()
+        if history:
+            history.close()
+    write_run_metrics(args, "all_boards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import re
+from functools import lru_cache
+
+from metrics import METRICS, set_gauge, timer
+
+TOKEN_RE = re.compile(r'\b\w+\b')
+STOPWORDS_FILE = os.path.join(os.path.abspath(os.path.dirname(__file__)), "stopwords_en.txt")
+
+_stemmer = None
+_stop_words = None
+
+
+def get_stop_words():
+    """
+    Loads the English stopwords once per process.
+
+    The list ships with the repo (stopwords_en.txt, NLTK's English list), so
+    no NLTK data has to be downloaded and scoring works offline.
+    """
+    global _stop_words
+    if _stop_words is None:
+        with open(STOPWORDS_FILE, "r", encoding="utf-8") as f:
+            _stop_words = frozenset(line.strip() for line in f if line.strip())
+    return _stop_words
+
+
+def get_stemmer():
+    """Creates the Porter stemmer on first use; importing NLTK takes over a second."""
+    global _stemmer
+    if _stemmer is None:
+        from nltk.stem import PorterStemmer
+        _stemmer = PorterStemmer()
+    return _stemmer
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Porter-stems a lowercase word, memoized across all descriptions."""
+    return get_stemmer().stem(word)
+
+
+def tokenize(text):
+    """Lowercases text and splits it into word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def stem_tokens(text):
+    """Tokenizes text, drops stopwords and returns the stemmed tokens in order."""
+    stop_words = get_stop_words()
+    with timer("stemming"):
+        return [stem(word) for word in tokenize(text) if word not in stop_words]
+
+
+def terms(text):
+    """Returns the set of distinct stemmed, stopword-free terms in text."""
+    return set(stem_tokens(text))
+
+
+def stem_cache_stats():
+    """
+    Reports how effective the stem cache has been.
+
+    Hits and misses include the lookups of scoring worker processes, which
+    report them as the worker_stem_cache_hits/misses counters (see
+    parallel_scoring.py); the size is that of this process's cache.
+
+    Returns:
+        dict: hits, misses, size and hit_rate (0-1) of the stem cache.
+    """
+    info = stem.cache_info()
+    hits = info.hits + METRICS.counters["worker_stem_cache_hits"]
+    misses = info.misses + METRICS.counters["worker_stem_cache_misses"]
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "size": info.currsize, "hit_rate": hits / lookups if lookups else 0.0}
+
+
+def print_stem_cache_stats():
+    stats = stem_cache_stats()
+    for name, value in stats.items():
+        set_gauge(f"stem_cache_{name}", value)
+    print(f"Stem cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
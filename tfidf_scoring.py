@@ -0,0 +1,75 @@
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from metrics import timer
+from text_processing import stem_tokens
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return diags(1.0 / norms) @ matrix
+
+
+class TfidfScorer:
+    """
+    Batch TF-IDF engine for ranking many job descriptions against resumes.
+
+    The descriptions are turned into one sparse document-term matrix with
+    smoothed IDF weights and L2-normalized rows. Resumes are projected onto the
+    same vocabulary, so scoring every resume against every job is a single
+    sparse matrix product giving cosine similarities.
+    """
+
+    @timer("tfidf_build")
+    def __init__(self, descriptions, term_counts=None):
+        """
+        Args:
+            descriptions: Job description texts.
+            term_counts: Optional stemmed term Counters of the descriptions,
+                already computed elsewhere (e.g. by parallel_scoring workers).
+        """
+        if term_counts is None:
+            term_counts = [Counter(stem_tokens(text)) for text in descriptions]
+        self.vocabulary = {}
+        counts = self._count_matrix(term_counts, grow=True)
+        n_docs = counts.shape[0]
+        doc_freq = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+        self.job_matrix = self._weight(counts)
+
+    def _count_matrix(self, term_counts, grow=False):
+        indptr, indices, data = [0], [], []
+        for counts in term_counts:
+            for term, count in counts.items():
+                index = self.vocabulary.get(term)
+                if index is None:
+                    if not grow:
+                        continue
+                    index = self.vocabulary[term] = len(self.vocabulary)
+                indices.append(index)
+                data.append(count)
+            indptr.append(len(indices))
+        return csr_matrix((np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+                          shape=(len(term_counts), len(self.vocabulary)))
+
+    def _weight(self, counts):
+        return _normalize_rows(counts @ diags(self.idf))
+
+    @timer("scoring")
+    def score(self, resume_indexes):
+        """
+        Scores resumes against every job description.
+
+        Args:
+            resume_indexes: List of ResumeIndex objects.
+
+        Returns:
+            numpy.ndarray: (resumes x jobs) cosine similarities as percentages.
+        """
+        if not self.vocabulary:
+            return np.zeros((len(resume_indexes), self.job_matrix.shape[0]))
+        resume_matrix = self._weight(self._count_matrix([index.term_freq for index in resume_indexes]))
+        return (resume_matrix @ self.job_matrix.T).toarray() * 100